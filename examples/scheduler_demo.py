@@ -8,11 +8,90 @@ This script demonstrates the enhanced scheduler functionality:
 3. Shows how to use the command-line interface
 """
 
+import argparse
+import importlib
+import re
 import subprocess
 import sys
 import os
+import threading
+import time
+from pathlib import Path
 
-def demo_single_scheduler():
+# Repository root, where imagegeneration_schedulers.py lives
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# tqdm progress updates, e.g. " 40%|████      | 20/50"
+_PROGRESS_RE = re.compile(r"\d+%\|")
+
+# Seconds the child may go without a progress update before it is considered hung
+STALL_TIMEOUT = 120
+
+def _stream_command(cmd, stall_timeout: float = STALL_TIMEOUT) -> int:
+    """
+    Run cmd, echoing its combined stdout/stderr line by line as it is produced.
+    
+    A watchdog terminates the child once it has gone stall_timeout seconds
+    without a tqdm progress update, so long but healthy runs are never cut off.
+    """
+    # A piped child stdout is block-buffered; unbuffer it so print() output streams too, not just tqdm
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"}
+    )
+    timed_out = threading.Event()
+    last_progress = time.monotonic()
+    
+    def _watchdog():
+        while process.poll() is None:
+            if time.monotonic() - last_progress > stall_timeout:
+                timed_out.set()
+                process.terminate()
+                return
+            time.sleep(1)
+    
+    watchdog = threading.Thread(target=_watchdog, daemon=True)
+    watchdog.start()
+    try:
+        # Universal newlines also split tqdm's carriage-return updates into lines
+        for line in process.stdout:
+            if _PROGRESS_RE.search(line):
+                last_progress = time.monotonic()
+            print(line, end="")
+    finally:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            # SIGTERM was ignored, escalate to SIGKILL
+            process.kill()
+            process.wait()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, stall_timeout)
+    return process.returncode
+
+def _import_schedulers_module():
+    """
+    Import imagegeneration_schedulers from the repository root.
+    
+    Running "python examples/scheduler_demo.py" puts examples/ on sys.path
+    rather than the root, so the root is added before importing.
+    """
+    root = str(_REPO_ROOT)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    return importlib.import_module("imagegeneration_schedulers")
+
+def _get_pipeline():
+    """Load the shared pipeline once so every in-process demo reuses its weights."""
+    imagegeneration_schedulers = _import_schedulers_module()
+    
+    if imagegeneration_schedulers._pipe is None:
+        print("Initializing pipeline...")
+        imagegeneration_schedulers.initialize_pipeline()
+    return imagegeneration_schedulers
+
+def demo_single_scheduler(isolated: bool = False):
     """Demonstrate single scheduler generation."""
     print("=" * 60)
     print("DEMO 1: Single Scheduler Generation")
@@ -24,6 +103,19 @@ def demo_single_scheduler():
     print(f"Generating image with scheduler: {scheduler}")
     print(f"Prompt: {prompt}")
     
+    if not isolated:
+        try:
+            schedulers_module = _get_pipeline()
+            output_path = schedulers_module.generate_image_with_scheduler(
+                prompt=prompt,
+                scheduler_name=scheduler,
+                filename_prefix="custom"
+            )
+            print(f"\nGenerated image: {output_path}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+        return
+    
     cmd = [
         sys.executable, "imagegeneration_schedulers.py",
         prompt,
@@ -31,18 +123,14 @@ def demo_single_scheduler():
     ]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
         print("\nOutput:")
-        print(result.stdout)
-        if result.stderr:
-            print("Errors:")
-            print(result.stderr)
+        _stream_command(cmd)
     except subprocess.TimeoutExpired:
-        print("⚠️  Generation timed out (>5 minutes)")
+        print(f"⚠️  Generation stalled (no progress for {STALL_TIMEOUT}s)")
     except Exception as e:
         print(f"❌ Error: {e}")
 
-def demo_scheduler_comparison():
+def demo_scheduler_comparison(isolated: bool = False):
     """Demonstrate scheduler comparison."""
     print("\n" + "=" * 60)
     print("DEMO 2: Scheduler Comparison")
@@ -54,6 +142,21 @@ def demo_scheduler_comparison():
     print(f"Comparing schedulers: {schedulers}")
     print(f"Prompt: {prompt}")
     
+    if not isolated:
+        try:
+            schedulers_module = _get_pipeline()
+            results = schedulers_module.generate_images_with_schedulers(
+                prompt=prompt,
+                schedulers_to_test=schedulers.split(","),
+                filename_prefix="comparison"
+            )
+            print(f"\nGenerated {len(results)} images:")
+            for scheduler_name, path in results.items():
+                print(f"  {scheduler_name}: {path}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+        return
+    
     cmd = [
         sys.executable, "imagegeneration_schedulers.py",
         prompt,
@@ -61,14 +164,10 @@ def demo_scheduler_comparison():
     ]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
         print("\nOutput:")
-        print(result.stdout)
-        if result.stderr:
-            print("Errors:")
-            print(result.stderr)
+        _stream_command(cmd)
     except subprocess.TimeoutExpired:
-        print("⚠️  Generation timed out (>10 minutes)")
+        print(f"⚠️  Generation stalled (no progress for {STALL_TIMEOUT}s)")
     except Exception as e:
         print(f"❌ Error: {e}")
 
@@ -78,42 +177,64 @@ def demo_list_schedulers():
     print("DEMO 3: Available Schedulers")
     print("=" * 60)
     
-    cmd = [sys.executable, "imagegeneration_schedulers.py", "--list"]
-    
+    # Importing the module only reads the SCHEDULERS registry; torch/CUDA stay unloaded
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        schedulers_module = _import_schedulers_module()
         print("Available schedulers:")
-        print(result.stdout)
-        if result.stderr:
-            print("Errors:")
-            print(result.stderr)
+        for i, scheduler in enumerate(schedulers_module.SCHEDULERS.keys(), 1):
+            print(f"  {i:2d}. {scheduler}")
+        print(f"\nTotal: {len(schedulers_module.SCHEDULERS)} schedulers")
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def _parse_args():
+    """Parse command-line options for the demo."""
+    parser = argparse.ArgumentParser(description="Stable Diffusion scheduler demo")
+    parser.add_argument("--mode", choices=["quick", "full", "single", "compare"], default=None,
+                        help="Demo to run (default: ask when interactive, otherwise quick)")
+    parser.add_argument("--quick", dest="mode", action="store_const", const="quick",
+                        help="Shortcut for --mode quick")
+    parser.add_argument("--yes", "-y", action="store_true",
+                        help="Run the full demo without prompting")
+    parser.add_argument("--isolated", action="store_true",
+                        help="Run each demo in a fresh interpreter instead of sharing one pipeline")
+    return parser.parse_args()
+
 def main():
     """Main demo function."""
+    args = _parse_args()
+    
     print("🎨 Stable Diffusion Scheduler Demo")
     print("This demo shows the enhanced scheduler functionality")
     print("\nNote: This demo requires CUDA and may take several minutes to complete.")
     
-    # Check if we should run the demos
-    if len(sys.argv) > 1 and sys.argv[1] == "--quick":
-        print("\n🏃 Quick mode: Only listing schedulers")
-        demo_list_schedulers()
-        return
+    mode = args.mode
+    if mode is None:
+        if args.yes:
+            mode = "full"
+        elif sys.stdin.isatty():
+            response = input("\n❓ Do you want to run the full demo? (y/N): ").lower().strip()
+            mode = "full" if response in ['y', 'yes'] else "quick"
+        else:
+            mode = "quick"
     
-    response = input("\n❓ Do you want to run the full demo? (y/N): ").lower().strip()
-    if response not in ['y', 'yes']:
-        print("👋 Running quick demo (schedulers list only)")
+    if mode == "quick":
+        print("\n🏃 Quick mode: Only listing schedulers")
         demo_list_schedulers()
         return
     
-    print("\n🚀 Starting full demo...")
+    print(f"\n🚀 Starting {mode} demo...")
     
-    # Run all demos
-    demo_list_schedulers()
-    demo_single_scheduler()
-    demo_scheduler_comparison()
+    demos = {
+        "full": lambda: (
+            demo_list_schedulers(),
+            demo_single_scheduler(isolated=args.isolated),
+            demo_scheduler_comparison(isolated=args.isolated)
+        ),
+        "single": lambda: demo_single_scheduler(isolated=args.isolated),
+        "compare": lambda: demo_scheduler_comparison(isolated=args.isolated),
+    }
+    demos[mode]()
     
     print("\n" + "=" * 60)
     print("✨ Demo completed!")
@@ -7,6 +7,10 @@ This script demonstrates how to:
 3. Compare different schedulers with the same prompt
 """
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 from imagegeneration_schedulers import generate_images_with_schedulers, initialize_pipeline, SCHEDULERS
 
 def example_test_all_schedulers():
@@ -23,7 +27,8 @@ def example_test_all_schedulers():
             guidance_scale=7.5,
             height=768,
             width=768,
-            filename_prefix="landscape_test"
+            filename_prefix="landscape_test",
+            use_deepcache=True
         )
         
         print(f"\nSuccessfully generated {len(results)} images:")
@@ -52,7 +57,9 @@ def example_test_specific_schedulers():
             height=512,
             width=512,
             output_dir="scheduler_comparison",
-            filename_prefix="robot_cyberpunk"
+            filename_prefix="robot_cyberpunk",
+            batch_schedulers=True,
+            cuda_graphs=True
         )
         
         print(f"\nSuccessfully generated {len(results)} images with fast schedulers:")
@@ -86,7 +93,8 @@ def example_quality_comparison():
             height=768,
             width=768,
             output_dir="quality_comparison",
-            filename_prefix="portrait_quality"
+            filename_prefix="portrait_quality",
+            use_deepcache=True
         )
         print(f"Quality schedulers completed: {len(quality_results)} images")
     except Exception as e:
@@ -118,6 +126,37 @@ def list_available_schedulers():
     for i, scheduler_name in enumerate(SCHEDULERS.keys(), 1):
         print(f"{i:2d}. {scheduler_name}")
 
+def _pin_gpu(gpu_id):
+    """
+    Pool initializer: restrict this worker process to a single GPU.
+    
+    CUDA reads CUDA_VISIBLE_DEVICES only once, at its first initialization,
+    so it has to be set when the worker starts rather than per task.
+    """
+    os.environ["CUDA_VISIBLE_DEVICES"] = str(gpu_id)
+
+def _run_config(config, prompt):
+    """
+    Run one test configuration.
+    
+    Must stay at module level so ProcessPoolExecutor can pickle it.
+    """
+    print(f"Testing {config['name']} configuration...")
+    try:
+        results = generate_images_with_schedulers(
+            prompt=prompt,
+            schedulers_to_test=config["schedulers"],
+            num_inference_steps=config["steps"],
+            height=config["height"],
+            width=config["width"],
+            output_dir=f"custom_{config['name']}",
+            filename_prefix=f"forest_{config['name']}",
+            use_deepcache=True
+        )
+        return f"  {config['name']} completed: {len(results)} images"
+    except Exception as e:
+        return f"  Error with {config['name']}: {e}"
+
 def example_custom_parameters():
     """Example with custom parameters for specific use cases."""
     
@@ -143,21 +182,32 @@ def example_custom_parameters():
     
     prompt = "a magical forest with glowing mushrooms, fantasy art"
     
-    for config in test_configs:
-        print(f"Testing {config['name']} configuration...")
-        try:
-            results = generate_images_with_schedulers(
-                prompt=prompt,
-                schedulers_to_test=config["schedulers"],
-                num_inference_steps=config["steps"],
-                height=config["height"],
-                width=config["width"],
-                output_dir=f"custom_{config['name']}",
-                filename_prefix=f"forest_{config['name']}"
-            )
-            print(f"  {config['name']} completed: {len(results)} images")
-        except Exception as e:
-            print(f"  Error with {config['name']}: {e}")
+    import torch
+    gpu_count = torch.cuda.device_count()
+    
+    if gpu_count <= 1:
+        for config in test_configs:
+            print(_run_config(config, prompt))
+        return
+    
+    # One single-worker pool per GPU, each pinned at startup, so every config
+    # really runs on the GPU it was assigned and each GPU runs one at a time
+    print(f"Distributing {len(test_configs)} configurations across {gpu_count} GPUs...")
+    context = multiprocessing.get_context("spawn")
+    pools = [
+        ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_pin_gpu, initargs=(gpu_id,))
+        for gpu_id in range(gpu_count)
+    ]
+    try:
+        futures = [
+            pools[index % gpu_count].submit(_run_config, config, prompt)
+            for index, config in enumerate(test_configs)
+        ]
+        for future in as_completed(futures):
+            print(future.result())
+    finally:
+        for pool in pools:
+            pool.shutdown(wait=True)
 
 if __name__ == "__main__":
     print("Scheduler Testing Examples")
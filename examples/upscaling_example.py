@@ -12,7 +12,16 @@ import os
 def example_direct_upscaling():
     """Example of using the upscaling function directly."""
     
-    # You can optionally initialize the pipeline first (it will be done automatically if not)
+    # Example 1: Basic upscaling
+    input_image = "final_outputs/test_image.png"  # Replace with your actual image path
+    
+    if not os.path.exists(input_image):
+        print(f"Input image not found: {input_image}")
+        print("Please generate an image first or provide a valid image path.")
+        return
+    
+    # Only load the pipeline once we know there is something to upscale;
+    # image_upscaling keeps it loaded for the later examples
     print("Initializing upscaling pipeline...")
     try:
         initialize_upscale_pipeline()
@@ -21,26 +30,19 @@ def example_direct_upscaling():
         print(f"Error initializing pipeline: {e}")
         return
     
-    # Example 1: Basic upscaling
-    input_image = "final_outputs/test_image.png"  # Replace with your actual image path
+    print(f"\nUpscaling image: {input_image}")
     
-    if os.path.exists(input_image):
-        print(f"\nUpscaling image: {input_image}")
+    try:
+        upscaled_path = upscale_image(
+            input_file=input_image,
+            prompt="enhance details, high quality, photorealistic",
+            num_inference_steps=50,
+            guidance_scale=7.5
+        )
+        print(f"Upscaled image saved to: {upscaled_path}")
         
-        try:
-            upscaled_path = upscale_image(
-                input_file=input_image,
-                prompt="enhance details, high quality, photorealistic",
-                num_inference_steps=50,
-                guidance_scale=7.5
-            )
-            print(f"Upscaled image saved to: {upscaled_path}")
-            
-        except Exception as e:
-            print(f"Error during upscaling: {e}")
-    else:
-        print(f"Input image not found: {input_image}")
-        print("Please generate an image first or provide a valid image path.")
+    except Exception as e:
+        print(f"Error during upscaling: {e}")
     
     # Example 2: Custom parameters
     print("\nExample with custom parameters:")
@@ -53,17 +55,16 @@ def example_direct_upscaling():
         "output_file": "custom_upscaled_image.png"  # Custom filename
     }
     
-    if os.path.exists(input_image):
-        try:
-            upscaled_path = upscale_image(
-                input_file=input_image,
-                prompt="ultra high resolution, sharp details, professional photography",
-                **custom_params
-            )
-            print(f"Custom upscaled image saved to: {upscaled_path}")
-            
-        except Exception as e:
-            print(f"Error during custom upscaling: {e}")
+    try:
+        upscaled_path = upscale_image(
+            input_file=input_image,
+            prompt="ultra high resolution, sharp details, professional photography",
+            **custom_params
+        )
+        print(f"Custom upscaled image saved to: {upscaled_path}")
+        
+    except Exception as e:
+        print(f"Error during custom upscaling: {e}")
 
 def example_from_imagegeneration():
     """Example of generating and then upscaling an image."""
@@ -84,7 +85,7 @@ def example_from_imagegeneration():
         
         print(f"Generated image: {generated_path}")
         
-        # Now upscale it
+        # Now upscale it; upscale_image reuses the pipeline from the first example if it was loaded
         print("Upscaling the generated image...")
         
         upscaled_path = upscale_image(
@@ -1,10 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
+import hashlib
+import io
 import os
 import uuid
+import zipfile
 from imagegeneration_final import generate_image, initialize_pipeline
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 import uvicorn
 
 app = FastAPI(title="Stable Diffusion Image Generation API", version="1.0.0")
@@ -104,6 +107,10 @@ class SingleSchedulerResponse(BaseModel):
     filename: str
     scheduler_used: str
 
+class DownloadBatchRequest(BaseModel):
+    filenames: List[str] = Field(..., min_length=1, description="Filenames to bundle into one ZIP archive")
+    output_dir: str = Field("final_outputs", description="Directory searched first for each file")
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the pipeline when the API starts."""
@@ -375,47 +382,160 @@ async def generate_with_scheduler_endpoint(request: SingleSchedulerRequest):
         raise HTTPException(status_code=500, detail=f"Error generating image with scheduler: {str(e)}")
 
 @app.get("/schedulers")
-async def list_schedulers():
+async def list_schedulers(if_none_match: Optional[str] = Header(None)):
     """
     List all available schedulers.
+    
+    The response carries an ETag derived from the scheduler names, so clients
+    can revalidate a cached copy and get a bodyless 304 when nothing changed.
     """
     try:
         from imagegeneration_schedulers import SCHEDULERS
-        return {
-            "schedulers": list(SCHEDULERS.keys()),
-            "total": len(SCHEDULERS),
-            "description": "Available schedulers for image generation"
-        }
+        etag = '"' + hashlib.sha1(",".join(SCHEDULERS).encode()).hexdigest()[:16] + '"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(
+            {
+                "schedulers": list(SCHEDULERS.keys()),
+                "total": len(SCHEDULERS),
+                "description": "Available schedulers for image generation"
+            },
+            headers={"ETag": etag}
+        )
     except ImportError:
         raise HTTPException(status_code=500, detail="Scheduler module not available")
 
-@app.get("/download/{filename}")
-async def download_image(filename: str, output_dir: str = "final_outputs"):
+# Default output directories, searched by download endpoints after the requested one
+OUTPUT_DIRS = ("final_outputs", "upscaled_outputs", "scheduler_outputs")
+
+def _validate_output_request(filename: str, output_dir: str):
     """
-    Download a generated image by filename from any output directory.
+    Reject filenames with path components and output directories that escape the working directory.
+    
+    Both values come from the client. Any relative output_dir is allowed, since the
+    generate and upscale endpoints write wherever the request asks, but absolute
+    paths and ".." segments could otherwise read arbitrary files.
+    """
+    if not filename or filename in (".", "..") or os.path.basename(filename) != filename:
+        raise HTTPException(status_code=400, detail=f"Invalid filename: '{filename}'")
+    if (not output_dir or os.path.isabs(output_dir)
+            or ".." in os.path.normpath(output_dir).split(os.sep)):
+        raise HTTPException(status_code=400, detail=f"Invalid output_dir: '{output_dir}'")
+
+def _find_output_file(filename: str, output_dir: str) -> str:
     """
-    # List of possible output directories
-    possible_dirs = [output_dir, "final_outputs", "upscaled_outputs", "scheduler_outputs"]
+    Locate a generated file in the requested or any known output directory.
+    """
+    _validate_output_request(filename, output_dir)
+    
+    # Search the requested directory first
+    possible_dirs = [output_dir] + [directory for directory in OUTPUT_DIRS if directory != output_dir]
     
-    file_path = None
     for directory in possible_dirs:
         potential_path = os.path.join(directory, filename)
         if os.path.exists(potential_path):
-            file_path = potential_path
-            break
+            return potential_path
     
-    if file_path is None:
-        raise HTTPException(
-            status_code=404, 
-            detail=f"File '{filename}' not found in any output directory: {possible_dirs}"
-        )
+    raise HTTPException(
+        status_code=404, 
+        detail=f"File '{filename}' not found in any output directory: {possible_dirs}"
+    )
+
+def _encode_image(img, fmt: str, quality: int) -> Response:
+    """
+    Encode a PIL image as a lossy WebP or JPEG response for display-only transport.
+    """
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        img.save(buffer, format="WEBP", quality=quality, method=4)
+    else:
+        img.convert("RGB").save(buffer, format="JPEG", quality=quality)
+    return Response(content=buffer.getvalue(), media_type=f"image/{fmt}")
+
+@app.get("/download/{filename}")
+def download_image(
+    filename: str,
+    output_dir: str = "final_outputs",
+    fmt: str = Query("png", pattern="^(png|webp)$"),
+    q: int = Query(85, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Download a generated image by filename from any output directory.
+    
+    fmt=webp re-encodes the image for display at quality q; the default png
+    returns the original file untouched, with an ETag from its mtime and size
+    so clients can revalidate and get a bodyless 304. Declared sync so
+    encoding runs in FastAPI's threadpool instead of the event loop.
+    """
+    file_path = _find_output_file(filename, output_dir)
+    
+    if fmt == "webp":
+        from PIL import Image
+        with Image.open(file_path) as img:
+            return _encode_image(img, fmt, q)
+    
+    stat = os.stat(file_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
     
     return FileResponse(
         path=file_path,
         media_type="image/png",
-        filename=filename
+        filename=filename,
+        headers={"ETag": etag}
     )
 
+@app.post("/download-batch")
+def download_batch(request: DownloadBatchRequest):
+    """
+    Download several generated images in a single ZIP archive.
+    
+    Files that cannot be found are left out of the archive rather than failing the batch;
+    an invalid filename or output_dir fails the whole request with 400.
+    """
+    filenames = list(dict.fromkeys(request.filenames))
+    for filename in filenames:
+        _validate_output_request(filename, request.output_dir)
+    
+    buffer = io.BytesIO()
+    # PNGs are already compressed, so store them as-is
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for filename in filenames:
+            try:
+                archive.write(_find_output_file(filename, request.output_dir), arcname=filename)
+            except HTTPException:
+                continue
+    buffer.seek(0)
+    
+    return StreamingResponse(
+        buffer,
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="images.zip"'}
+    )
+
+@app.get("/thumbnail/{filename}")
+def thumbnail_image(
+    filename: str,
+    w: int = Query(300, ge=16, le=1024),
+    output_dir: str = "final_outputs",
+    fmt: str = Query("jpeg", pattern="^(jpeg|webp)$"),
+    q: int = Query(85, ge=1, le=100)
+):
+    """
+    Return a JPEG or WebP thumbnail no wider or taller than w pixels for gallery grids.
+    
+    Declared sync so the resize runs in FastAPI's threadpool instead of the event loop.
+    """
+    from PIL import Image
+    
+    file_path = _find_output_file(filename, output_dir)
+    
+    with Image.open(file_path) as img:
+        img.thumbnail((w, w), Image.LANCZOS)
+        return _encode_image(img, fmt, q)
+
 @app.get("/health")
 async def health_check():
     """
@@ -440,7 +560,9 @@ async def root():
             "test-schedulers": "/test-schedulers - POST endpoint to test multiple schedulers",
             "schedulers": "/schedulers - GET endpoint to list available schedulers",
             "files": "/files - GET endpoint to list all generated files",
-            "download": "/download/{filename} - GET endpoint to download generated images",
+            "download": "/download/{filename}?fmt=png|webp - GET endpoint to download generated images",
+            "download-batch": "/download-batch - POST endpoint to download several images as one ZIP",
+            "thumbnail": "/thumbnail/{filename}?w=300&fmt=jpeg|webp - GET endpoint for a small JPEG/WebP preview of an image",
             "health": "/health - GET endpoint for health check",
             "docs": "/docs - Interactive API documentation"
         }
@@ -451,10 +573,9 @@ async def list_generated_files():
     """
     List all generated image files across all output directories.
     """
-    output_dirs = ["final_outputs", "upscaled_outputs", "scheduler_outputs"]
     files_info = {}
     
-    for directory in output_dirs:
+    for directory in OUTPUT_DIRS:
         if os.path.exists(directory):
             files = []
             for file in os.listdir(directory):
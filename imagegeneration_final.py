@@ -8,6 +8,10 @@ from typing import Optional
 _pipe = None
 _current_model_id = None
 
+# Outputs larger than this many pixels are decoded with a tiled/sliced VAE
+VAE_TILING_MIN_PIXELS = 1024 * 1024
+VAE_TILE_SAMPLE_SIZE = 512
+
 def initialize_pipeline():
     """Initialize the appropriate Stable Diffusion pipeline based on GPU memory."""
     global _pipe, _current_model_id
@@ -56,6 +60,18 @@ def generate_image(
 
     os.makedirs(output_dir, exist_ok=True)
 
+    # Decode large outputs in overlapping tiles to cap VAE peak memory
+    if height * width > VAE_TILING_MIN_PIXELS:
+        # tiled_decode steps through latents by tile_latent_min_size but crops by
+        # tile_sample_min_size, so the two must describe the same tile
+        _pipe.vae.tile_sample_min_size = VAE_TILE_SAMPLE_SIZE
+        _pipe.vae.tile_latent_min_size = VAE_TILE_SAMPLE_SIZE // _pipe.vae_scale_factor
+        _pipe.vae.enable_tiling()
+        _pipe.vae.enable_slicing()
+    else:
+        _pipe.vae.disable_tiling()
+        _pipe.vae.disable_slicing()
+
     result = _pipe(
         prompt=prompt,
         negative_prompt=negative_prompt,
@@ -1,57 +1,95 @@
-import torch
-from diffusers import (
-    StableDiffusionPipeline,
-    StableDiffusion3Pipeline,
-    DDIMScheduler,
-    DDPMScheduler,
-    DEISMultistepScheduler,
-    DPMSolverMultistepScheduler,
-    DPMSolverSinglestepScheduler,
-    DPMSolverSDEScheduler,
-    EDMDPMSolverMultistepScheduler,
-    EDMEulerScheduler,
-    EulerAncestralDiscreteScheduler,
-    EulerDiscreteScheduler,
-    HeunDiscreteScheduler,
-    IPNDMScheduler,
-    KDPM2AncestralDiscreteScheduler,
-    KDPM2DiscreteScheduler,
-    LCMScheduler,
-    LMSDiscreteScheduler,
-    PNDMScheduler
-)
+import importlib
+import functools
+import multiprocessing
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import shared_memory
+from pathlib import Path
 from typing import Optional, List, Dict, Any
 
 # Global pipeline variable to avoid reloading the model
 _pipe = None
 _current_model_id = None
 
-# Scheduler name to class mapping
+# (height, width) shapes the compiled pipeline has already been warmed up for
+_compiled_shapes = set()
+
+# Scheduler objects built once from the pipeline's original scheduler config.
+# They are shared by reference; the pipeline's set_timesteps call resets their
+# per-run state, so no copy is needed between runs.
+_base_scheduler_config = None
+SCHEDULER_INSTANCES: Dict[str, Any] = {}
+
+# Text-encoder outputs keyed by (prompt, negative_prompt, do_classifier_free_guidance)
+_prompt_embeds_cache: Dict[tuple, Dict[str, Any]] = {}
+_PROMPT_EMBEDS_CACHE_SIZE = 16
+
+# Schedulers that take too few steps for DeepCache feature reuse to be safe
+DEEPCACHE_UNSUPPORTED = {"LCM"}
+
+# First-block cache for DiT pipelines: skip the remaining transformer blocks when
+# block 0's output changes by less than this relative L1 distance
+FBCACHE_THRESHOLD = 0.08
+FBCACHE_MIN_STEPS = 11
+
+# Schedulers with too few steps to amortize a CUDA graph capture
+CUDA_GRAPH_UNSUPPORTED = {"LCM"}
+
+# Schedulers kept out of batched denoising because their step schedule diverges
+BATCH_SERIAL_ONLY = {"HeunDiscrete", "DPMSolverSDE"}
+
+# Flat pinned host staging buffers reused across sweeps and regrown only when a
+# larger resolution comes along, so sweeps at many sizes don't pin one set each.
+# One slot per save worker so encodes never wait on a shared buffer.
+_SAVE_WORKERS = 4
+_staging_buffers: List[Any] = []
+_STAGING_SLOTS = _SAVE_WORKERS
+
+# Sweeps above this many pixels decode with a bf16, tiled and sliced VAE
+VAE_TILING_MIN_PIXELS = 768 * 768
+
+# Set once the missing-pyarrow notice has been printed, so sweeps don't repeat it
+_manifest_unavailable_warned = False
+
+# PNG zlib level for sweep outputs; 1 trades a slightly larger file for much faster encodes
+_PNG_COMPRESS_LEVEL = 1
+
+# Scheduler name to "module.ClassName" mapping. Classes are imported lazily by
+# _load_scheduler_cls so listing schedulers doesn't pay the diffusers import cost.
 SCHEDULERS = {
-    "DDIM": DDIMScheduler,
-    "DDPM": DDPMScheduler,
-    "DEISMultistep": DEISMultistepScheduler,
-    "DPMSolverMultistep": DPMSolverMultistepScheduler,
-    "DPMSolverSinglestep": DPMSolverSinglestepScheduler,
-    "DPMSolverSDE": DPMSolverSDEScheduler,
-    "EDMDPMSolverMultistep": EDMDPMSolverMultistepScheduler,
-    "EDMEuler": EDMEulerScheduler,
-    "EulerAncestral": EulerAncestralDiscreteScheduler,
-    "EulerDiscrete": EulerDiscreteScheduler,
-    "HeunDiscrete": HeunDiscreteScheduler,
-    "IPNDM": IPNDMScheduler,
-    "KDPM2Ancestral": KDPM2AncestralDiscreteScheduler,
-    "KDPM2": KDPM2DiscreteScheduler,
-    "LCM": LCMScheduler,
-    "LMS": LMSDiscreteScheduler,
-    "PNDM": PNDMScheduler,
+    "DDIM": "diffusers.DDIMScheduler",
+    "DDPM": "diffusers.DDPMScheduler",
+    "DEISMultistep": "diffusers.DEISMultistepScheduler",
+    "DPMSolverMultistep": "diffusers.DPMSolverMultistepScheduler",
+    "DPMSolverSinglestep": "diffusers.DPMSolverSinglestepScheduler",
+    "DPMSolverSDE": "diffusers.DPMSolverSDEScheduler",
+    "EDMDPMSolverMultistep": "diffusers.EDMDPMSolverMultistepScheduler",
+    "EDMEuler": "diffusers.EDMEulerScheduler",
+    "EulerAncestral": "diffusers.EulerAncestralDiscreteScheduler",
+    "EulerDiscrete": "diffusers.EulerDiscreteScheduler",
+    "HeunDiscrete": "diffusers.HeunDiscreteScheduler",
+    "IPNDM": "diffusers.IPNDMScheduler",
+    "KDPM2Ancestral": "diffusers.KDPM2AncestralDiscreteScheduler",
+    "KDPM2": "diffusers.KDPM2DiscreteScheduler",
+    "LCM": "diffusers.LCMScheduler",
+    "LMS": "diffusers.LMSDiscreteScheduler",
+    "PNDM": "diffusers.PNDMScheduler",
 }
 
+@functools.lru_cache(maxsize=None)
+def _load_scheduler_cls(name: str):
+    """Import and return the scheduler class registered under name."""
+    module_name, class_name = SCHEDULERS[name].rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
 def initialize_pipeline():
     """Initialize the appropriate Stable Diffusion pipeline based on GPU memory."""
-    global _pipe, _current_model_id
+    global _pipe, _current_model_id, _base_scheduler_config
+    # torch/diffusers are imported here so listing SCHEDULERS stays import-light
+    import torch
+    from diffusers import StableDiffusionPipeline, StableDiffusion3Pipeline
     
     # Check for CUDA availability
     if not torch.cuda.is_available():
@@ -77,8 +115,418 @@ def initialize_pipeline():
     
     _pipe = _pipe.to("cuda")
     _current_model_id = model_id
+    _base_scheduler_config = _pipe.scheduler.config
+    _prompt_embeds_cache.clear()
+    _compiled_shapes.clear()
+    SCHEDULER_INSTANCES.clear()
+    
+    quant_dtype = os.environ.get("SCHEDULER_QUANT_DTYPE")
+    if quant_dtype:
+        _quantize_pipeline(quant_dtype)
+    if os.environ.get("SCHEDULER_TORCH_COMPILE") == "1":
+        _compile_pipeline()
     return _pipe
 
+def _compile_pipeline():
+    """Compile the denoiser and VAE decode with torch.compile so every scheduler reuses the graphs."""
+    import torch
+    
+    print("Compiling denoiser and VAE decoder with torch.compile (first run per resolution is slow)")
+    if getattr(_pipe, "transformer", None) is not None:
+        _pipe.transformer = torch.compile(_pipe.transformer, mode="reduce-overhead")
+    else:
+        _pipe.unet = torch.compile(_pipe.unet, mode="reduce-overhead", fullgraph=True)
+    _pipe.vae.decode = torch.compile(_pipe.vae.decode)
+    _pipe._is_compiled = True
+
+def _warmup_compiled(prompt_embeds: Dict[str, Any], guidance_scale: float, height: int, width: int):
+    """Run a one-step generation so graph capture happens before the scheduler loop, once per shape."""
+    if not getattr(_pipe, "_is_compiled", False) or (height, width) in _compiled_shapes:
+        return
+    
+    print(f"Warming up compiled pipeline for {width}x{height}...")
+    _pipe(num_inference_steps=1, guidance_scale=guidance_scale, height=height, width=width, **prompt_embeds)
+    _compiled_shapes.add((height, width))
+
+def _quantize_pipeline(quant_dtype: str):
+    """Apply weight-only torchao quantization ("int8" or "fp8") to the denoiser and VAE decoder."""
+    try:
+        from torchao.quantization import quantize_, int8_weight_only, float8_weight_only
+    except ImportError as e:
+        print(f"torchao not available, skipping {quant_dtype} quantization: {e}")
+        return
+    
+    configs = {"int8": int8_weight_only, "fp8": float8_weight_only}
+    if quant_dtype not in configs:
+        print(f"Warning: Unknown SCHEDULER_QUANT_DTYPE '{quant_dtype}', expected one of {list(configs)}")
+        return
+    
+    denoiser = getattr(_pipe, "transformer", None) or _pipe.unet
+    print(f"Quantizing denoiser and VAE decoder weights to {quant_dtype}")
+    quantize_(denoiser, configs[quant_dtype]())
+    quantize_(_pipe.vae.decoder, configs[quant_dtype]())
+
+def _get_scheduler_instance(name: str):
+    """Return the shared scheduler instance for name, building it on first use."""
+    if name not in SCHEDULER_INSTANCES:
+        SCHEDULER_INSTANCES[name] = _load_scheduler_cls(name).from_config(_base_scheduler_config)
+    return SCHEDULER_INSTANCES[name]
+
+def _get_prompt_embeds(prompt: str, negative_prompt: Optional[str], guidance_scale: float) -> Dict[str, Any]:
+    """
+    Encode a prompt once and return the embedding kwargs for the pipeline call.
+    
+    The text encoder output only depends on the prompt pair and whether
+    classifier-free guidance is active, so it is shared by every scheduler.
+    """
+    do_classifier_free_guidance = guidance_scale > 1
+    key = (prompt, negative_prompt, do_classifier_free_guidance)
+    if key in _prompt_embeds_cache:
+        return _prompt_embeds_cache[key]
+    
+    import torch
+    with torch.no_grad():
+        if hasattr(_pipe, "text_encoder_3"):
+            # Stable Diffusion 3 pipelines also return pooled embeddings
+            prompt_embeds, negative_prompt_embeds, pooled, negative_pooled = _pipe.encode_prompt(
+                prompt=prompt,
+                prompt_2=None,
+                prompt_3=None,
+                device=_pipe.device,
+                num_images_per_prompt=1,
+                do_classifier_free_guidance=do_classifier_free_guidance,
+                negative_prompt=negative_prompt
+            )
+            embeds = {
+                "prompt_embeds": prompt_embeds,
+                "negative_prompt_embeds": negative_prompt_embeds,
+                "pooled_prompt_embeds": pooled,
+                "negative_pooled_prompt_embeds": negative_pooled,
+            }
+        else:
+            prompt_embeds, negative_prompt_embeds = _pipe.encode_prompt(
+                prompt,
+                _pipe.device,
+                1,
+                do_classifier_free_guidance,
+                negative_prompt=negative_prompt
+            )
+            embeds = {
+                "prompt_embeds": prompt_embeds,
+                "negative_prompt_embeds": negative_prompt_embeds,
+            }
+    
+    if len(_prompt_embeds_cache) >= _PROMPT_EMBEDS_CACHE_SIZE:
+        _prompt_embeds_cache.pop(next(iter(_prompt_embeds_cache)))
+    _prompt_embeds_cache[key] = embeds
+    return embeds
+
+def _create_deepcache_helper():
+    """Create a DeepCache helper for UNet pipelines, or None if unavailable."""
+    if getattr(_pipe, "unet", None) is None:
+        print("DeepCache only supports UNet pipelines, running without it")
+        return None
+    
+    try:
+        from DeepCache import DeepCacheSDHelper
+    except ImportError as e:
+        print(f"DeepCache not available: {e}")
+        return None
+    
+    helper = DeepCacheSDHelper(pipe=_pipe)
+    helper.set_params(cache_interval=3, cache_branch_id=0)
+    return helper
+
+def _enable_first_block_cache():
+    """Enable diffusers' first-block cache on a DiT transformer, returning the transformer or None."""
+    transformer = getattr(_pipe, "transformer", None)
+    if transformer is None or not hasattr(transformer, "enable_cache"):
+        print("First-block cache needs a DiT pipeline with diffusers cache support, running without it")
+        return None
+    
+    try:
+        from diffusers.hooks import FirstBlockCacheConfig
+    except ImportError as e:
+        print(f"First-block cache not available in this diffusers version: {e}")
+        return None
+    
+    transformer.enable_cache(FirstBlockCacheConfig(threshold=FBCACHE_THRESHOLD))
+    return transformer
+
+class _UNetGraphRunner:
+    """
+    Replay UNet forwards from a captured CUDA graph.
+    
+    Installed as the UNet's instance-level forward. The first call for a given
+    input signature runs eagerly, the second captures a graph, and every later
+    call copies its inputs into the static tensors and replays it. The graph is
+    kept across schedulers because they all feed identically shaped inputs.
+    Calls with extra conditioning kwargs always run eagerly.
+    """
+    
+    def __init__(self, unet):
+        self.unet = unet
+        self.eager_forward = unet.forward
+        self.signature = None
+        self.graph = None
+        self.eager_calls = 0
+    
+    def install(self):
+        self.unet.forward = self
+    
+    def uninstall(self):
+        self.unet.__dict__.pop("forward", None)
+    
+    def __call__(self, sample, timestep, encoder_hidden_states, return_dict=True, **kwargs):
+        import torch
+        
+        if any(value is not None for value in kwargs.values()) or not torch.is_tensor(timestep):
+            return self.eager_forward(sample, timestep, encoder_hidden_states, return_dict=return_dict, **kwargs)
+        
+        signature = (sample.shape, sample.dtype, timestep.shape, timestep.dtype, encoder_hidden_states.shape)
+        if signature != self.signature:
+            self.signature = signature
+            self.graph = None
+            self.eager_calls = 0
+        
+        if self.graph is None:
+            self.eager_calls += 1
+            if self.eager_calls < 2:
+                return self.eager_forward(sample, timestep, encoder_hidden_states, return_dict=return_dict)
+            self._capture(sample, timestep, encoder_hidden_states)
+        
+        self.static_sample.copy_(sample)
+        self.static_timestep.copy_(timestep)
+        self.static_encoder_hidden_states.copy_(encoder_hidden_states)
+        self.graph.replay()
+        output = self.static_output.clone()
+        
+        if not return_dict:
+            return (output,)
+        from diffusers.models.unets.unet_2d_condition import UNet2DConditionOutput
+        return UNet2DConditionOutput(sample=output)
+    
+    def _capture(self, sample, timestep, encoder_hidden_states):
+        import torch
+        
+        self.static_sample = sample.clone()
+        self.static_timestep = timestep.to(sample.device).clone()
+        self.static_encoder_hidden_states = encoder_hidden_states.clone()
+        
+        # Warm up on a side stream as required before graph capture
+        side_stream = torch.cuda.Stream()
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream):
+            for _ in range(2):
+                self.eager_forward(self.static_sample, self.static_timestep, self.static_encoder_hidden_states, return_dict=False)
+        torch.cuda.current_stream().wait_stream(side_stream)
+        
+        self.graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.graph):
+            self.static_output = self.eager_forward(
+                self.static_sample, self.static_timestep, self.static_encoder_hidden_states, return_dict=False
+            )[0]
+
+def _sanitize_prompt(prompt: str) -> str:
+    """Turn the start of a prompt into a filename-safe slug."""
+    sanitized_prompt = "".join(c for c in prompt[:30] if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    return sanitized_prompt.replace(' ', '_').lower()
+
+def _build_output_path(output_dir: str, filename_prefix: str, prompt: str, scheduler_name: str, num_inference_steps: int) -> str:
+    """Build the output path for an image generated with scheduler_name."""
+    return _build_output_paths(output_dir, filename_prefix, prompt, [scheduler_name], num_inference_steps)[scheduler_name]
+
+def _build_output_paths(output_dir: str, filename_prefix: str, prompt: str, scheduler_names: List[str], num_inference_steps: int) -> Dict[str, str]:
+    """Build every scheduler's output path up front, sanitizing the prompt only once."""
+    stem = f"{filename_prefix}_{_sanitize_prompt(prompt)}"
+    return {
+        name: os.path.join(output_dir, f"{stem}_{name.lower()}_{num_inference_steps}steps.png")
+        for name in scheduler_names
+    }
+
+def _group_batchable_schedulers(scheduler_names: List[str], num_inference_steps: int, max_batch_size: int):
+    """
+    Split schedulers into groups that can share UNet forwards.
+    
+    Schedulers are grouped when their timestep tables are identical, so every
+    member evaluates the UNet at the same t on every step.
+    
+    Returns:
+        Tuple of (list of [(name, scheduler), ...] groups, list of names to run serially)
+    """
+    buckets: Dict[tuple, List[tuple]] = {}
+    serial = []
+    for scheduler_name in scheduler_names:
+        if scheduler_name in BATCH_SERIAL_ONLY:
+            serial.append(scheduler_name)
+            continue
+        scheduler = _get_scheduler_instance(scheduler_name)
+        scheduler.set_timesteps(num_inference_steps, device=_pipe.device)
+        key = tuple(scheduler.timesteps.tolist())
+        buckets.setdefault(key, []).append((scheduler_name, scheduler))
+    
+    groups = []
+    for members in buckets.values():
+        if len(members) == 1:
+            serial.append(members[0][0])
+            continue
+        for start in range(0, len(members), max_batch_size):
+            chunk = members[start:start + max_batch_size]
+            if len(chunk) == 1:
+                serial.append(chunk[0][0])
+            else:
+                groups.append(chunk)
+    return groups, serial
+
+def _denoise_batched(group, prompt_embeds: Dict[str, Any], guidance_scale: float, height: int, width: int):
+    """
+    Denoise one latent per scheduler in lockstep, batching their UNet calls.
+    
+    All schedulers in the group must share the same timestep table. They start
+    from the same initial noise so their outputs stay comparable. Returns one
+    PIL image per group member.
+    """
+    import torch
+    
+    with torch.no_grad():
+        unet = _pipe.unet
+        device = _pipe.device
+        batch_size = len(group)
+        do_classifier_free_guidance = guidance_scale > 1
+        
+        text_embeds = prompt_embeds["prompt_embeds"]
+        encoder_hidden_states = text_embeds.repeat(batch_size, 1, 1)
+        if do_classifier_free_guidance:
+            negative_embeds = prompt_embeds["negative_prompt_embeds"].repeat(batch_size, 1, 1)
+            encoder_hidden_states = torch.cat([negative_embeds, encoder_hidden_states])
+        
+        latent_shape = (1, unet.config.in_channels, height // _pipe.vae_scale_factor, width // _pipe.vae_scale_factor)
+        noise = torch.randn(latent_shape, device=device, dtype=text_embeds.dtype)
+        latents = [noise * scheduler.init_noise_sigma for _, scheduler in group]
+        
+        for t in group[0][1].timesteps:
+            sample = torch.cat([scheduler.scale_model_input(latent, t) for (_, scheduler), latent in zip(group, latents)])
+            if do_classifier_free_guidance:
+                sample = torch.cat([sample, sample])
+        
+            noise_pred = unet(sample, t, encoder_hidden_states=encoder_hidden_states).sample
+            if do_classifier_free_guidance:
+                noise_uncond, noise_text = noise_pred.chunk(2)
+                noise_pred = noise_uncond + guidance_scale * (noise_text - noise_uncond)
+        
+            for i, ((_, scheduler), noise_i) in enumerate(zip(group, noise_pred.split(1))):
+                latents[i] = scheduler.step(noise_i, t, latents[i]).prev_sample
+        
+        latents = torch.cat(latents) / _pipe.vae.config.scaling_factor
+        decoded = _pipe.vae.decode(latents.to(_pipe.vae.dtype)).sample
+        return _pipe.image_processor.postprocess(decoded, output_type="pil")
+
+def _configure_vae_for_resolution(height: int, width: int):
+    """
+    Switch the VAE to bf16 tiled/sliced decoding for large outputs.
+    
+    Only the VAE is touched, so scheduler trajectories through the denoiser
+    are unchanged. GPUs without bf16 support (pre-Ampere) only get tiling.
+    The pipeline's own decode does not cast latents, so the caller must hand
+    the returned dtype to _restore_vae_dtype once the sweep is done.
+    
+    Returns:
+        The VAE dtype to restore afterwards, or None if it was not changed
+    """
+    import torch
+    
+    if height * width <= VAE_TILING_MIN_PIXELS:
+        _pipe.vae.disable_tiling()
+        _pipe.vae.disable_slicing()
+        return None
+    
+    original_dtype = None
+    if torch.cuda.is_bf16_supported() and _pipe.vae.dtype != torch.bfloat16:
+        original_dtype = _pipe.vae.dtype
+        _pipe.vae.to(torch.bfloat16)
+    _pipe.vae.enable_tiling()
+    _pipe.vae.enable_slicing()
+    return original_dtype
+
+def _restore_vae_dtype(original_dtype):
+    """Cast the VAE back after _configure_vae_for_resolution so later pipeline decodes match the latents."""
+    if original_dtype is not None:
+        _pipe.vae.to(original_dtype)
+
+def _get_staging_buffers(height: int, width: int) -> List[Any]:
+    """Return (H, W, 3) uint8 views into the pinned host buffers, growing them if they are too small."""
+    import torch
+    
+    size = height * width * 3
+    if not _staging_buffers or _staging_buffers[0].numel() < size:
+        # Release the smaller buffers before pinning their replacements
+        _staging_buffers.clear()
+        _staging_buffers.extend(
+            torch.empty(size, dtype=torch.uint8, pin_memory=True)
+            for _ in range(_STAGING_SLOTS)
+        )
+    return [buffer[:size].view(height, width, 3) for buffer in _staging_buffers]
+
+def _decode_latents_to_uint8(latents):
+    """Decode pipeline latents with the VAE into a (H, W, 3) uint8 tensor on the GPU."""
+    import torch
+    
+    with torch.no_grad():
+        latents = latents / _pipe.vae.config.scaling_factor
+        shift_factor = getattr(_pipe.vae.config, "shift_factor", None)
+        if shift_factor:
+            latents = latents + shift_factor
+        image = _pipe.vae.decode(latents.to(_pipe.vae.dtype)).sample
+        image = ((image / 2 + 0.5).clamp(0, 1) * 255).round().to(torch.uint8)
+        return image[0].permute(1, 2, 0)
+
+def _save_staged_image(staging, copy_done, path: str):
+    """Wait for the device-to-host copy into staging, then encode and save it as PNG."""
+    from PIL import Image
+    
+    copy_done.synchronize()
+    Image.fromarray(staging.numpy()).save(path, format="PNG", compress_level=_PNG_COMPRESS_LEVEL)
+
+def _encode_shared_png(shm_name: str, shape: tuple, path: str):
+    """Encoder-process worker: save the uint8 image held in shared memory block shm_name as PNG."""
+    import numpy as np
+    from PIL import Image
+    
+    # Spawned children share the parent's resource tracker, which owns and
+    # unlinks the block; unregistering here would drop the parent's entry
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        array = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+        Image.fromarray(array).save(path, format="PNG", compress_level=_PNG_COMPRESS_LEVEL)
+        del array
+    finally:
+        block.close()
+
+def _write_manifest(manifest: Dict[str, List[Any]], output_dir: str):
+    """
+    Write the sweep's column-oriented results to manifest.parquet in output_dir.
+    
+    The manifest is a by-product: the images are already saved, so failures
+    are logged rather than raised, and a missing pyarrow is reported once.
+    """
+    global _manifest_unavailable_warned
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        if not _manifest_unavailable_warned:
+            print(f"pyarrow not available, skipping manifests: {e}")
+            _manifest_unavailable_warned = True
+        return
+    
+    manifest_path = os.path.join(output_dir, "manifest.parquet")
+    try:
+        pq.write_table(pa.Table.from_pydict(manifest), manifest_path)
+    except (OSError, pa.ArrowException) as e:
+        print(f"Error writing manifest {manifest_path}: {e}")
+        return
+    print(f"Manifest: {manifest_path}")
+
 def generate_images_with_schedulers(
     prompt: str,
     negative_prompt: Optional[str] = "blurry, low quality, ugly, bad anatomy, deformed hands,deformed fingers,extra limbs, poorly drawn face",
@@ -88,7 +536,13 @@ def generate_images_with_schedulers(
     width: int = 768,
     output_dir: str = "scheduler_outputs",
     schedulers_to_test: Optional[List[str]] = None,
-    filename_prefix: str = "scheduler_test"
+    filename_prefix: str = "scheduler_test",
+    use_deepcache: bool = False,
+    batch_schedulers: bool = False,
+    max_batch_size: int = 4,
+    fbcache: bool = False,
+    cuda_graphs: bool = False,
+    encoder_processes: bool = False
 ) -> Dict[str, str]:
     """
     Generate images using different schedulers.
@@ -103,11 +557,18 @@ def generate_images_with_schedulers(
         output_dir: Directory to save the output images
         schedulers_to_test: List of scheduler names to test (if None, tests all)
         filename_prefix: Prefix for output filenames
+        use_deepcache: Reuse UNet features across adjacent timesteps with DeepCache
+        batch_schedulers: Batch UNet calls of schedulers that share a timestep table (UNet pipelines only)
+        max_batch_size: Maximum number of schedulers denoised together when batching
+        fbcache: Use first-block caching on DiT (SD3) pipelines; ignored for 10 steps or fewer
+        cuda_graphs: Replay UNet forwards from a CUDA graph shared by all schedulers (UNet pipelines only)
+        encoder_processes: Encode PNGs in worker processes fed through shared memory instead of threads
     
     Returns:
         Dict[str, str]: Dictionary mapping scheduler names to output file paths
     """
     global _pipe
+    import torch
     
     # Initialize pipeline if not already done
     if _pipe is None:
@@ -118,7 +579,7 @@ def generate_images_with_schedulers(
         schedulers_to_test = list(SCHEDULERS.keys())
     
     # Ensure output folder exists
-    os.makedirs(output_dir, exist_ok=True)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     # Store the original scheduler
     original_scheduler = _pipe.scheduler
@@ -126,49 +587,179 @@ def generate_images_with_schedulers(
     
     print(f"Testing {len(schedulers_to_test)} schedulers...")
     
-    # Loop through each scheduler
-    for scheduler_name in schedulers_to_test:
-        if scheduler_name not in SCHEDULERS:
-            print(f"Warning: Unknown scheduler '{scheduler_name}', skipping...")
-            continue
-            
-        print(f"Generating image with scheduler: {scheduler_name}")
+    # Encode the prompt once; every scheduler reuses the same embeddings
+    prompt_embeds = _get_prompt_embeds(prompt, negative_prompt, guidance_scale)
+    
+    # Keeping height/width fixed across the loop lets every scheduler reuse the compiled graphs.
+    # Warm up before the VAE changes dtype: the pipeline's own decode does not cast latents.
+    _warmup_compiled(prompt_embeds, guidance_scale, height, width)
+    
+    vae_dtype = _configure_vae_for_resolution(height, width)
+    # The pipeline is shared with the API, so the scheduler and VAE precision
+    # are restored even when the sweep fails partway
+    try:
+        deepcache_helper = _create_deepcache_helper() if use_deepcache else None
+        use_fbcache = fbcache and num_inference_steps >= FBCACHE_MIN_STEPS
         
-        try:
-            # Replace scheduler
-            SchedulerClass = SCHEDULERS[scheduler_name]
-            scheduler = SchedulerClass.from_config(_pipe.scheduler.config)
-            _pipe.scheduler = scheduler
-            
-            # Run inference
-            image = _pipe(
-                prompt=prompt,
-                negative_prompt=negative_prompt,
-                num_inference_steps=num_inference_steps,
-                guidance_scale=guidance_scale,
-                height=height,
-                width=width
-            ).images[0]
-            
-            # Generate filename based on scheduler
-            sanitized_prompt = "".join(c for c in prompt[:30] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            sanitized_prompt = sanitized_prompt.replace(' ', '_').lower()
-            filename = f"{filename_prefix}_{sanitized_prompt}_{scheduler_name.lower()}_{num_inference_steps}steps.png"
-            full_path = os.path.join(output_dir, filename)
+        known_schedulers = []
+        for scheduler_name in schedulers_to_test:
+            if scheduler_name not in SCHEDULERS:
+                print(f"Warning: Unknown scheduler '{scheduler_name}', skipping...")
+                continue
+            known_schedulers.append(scheduler_name)
+        
+        output_paths = _build_output_paths(output_dir, filename_prefix, prompt, known_schedulers, num_inference_steps)
+        
+        # Images are encoded and written on worker threads so the GPU can start the
+        # next scheduler immediately; the pool is drained before returning
+        pending_saves = []
+        save_executor = ThreadPoolExecutor(max_workers=_SAVE_WORKERS)
+        
+        serial_schedulers = known_schedulers
+        if batch_schedulers:
+            if getattr(_pipe, "unet", None) is None or deepcache_helper is not None or use_fbcache:
+                print("Batched scheduler denoising needs a UNet pipeline without DeepCache/first-block cache, running serially")
+            else:
+                groups, serial_schedulers = _group_batchable_schedulers(
+                    known_schedulers, num_inference_steps, max_batch_size
+                )
+                for group in groups:
+                    names = [name for name, _ in group]
+                    print(f"Generating images with batched schedulers: {', '.join(names)}")
+                    start_time = time.perf_counter()
+                    try:
+                        images = _denoise_batched(group, prompt_embeds, guidance_scale, height, width)
+                    except Exception as e:
+                        print(f"Error with batched schedulers {names}: {e}, retrying serially")
+                        serial_schedulers.extend(names)
+                        continue
+                    wall_ms = (time.perf_counter() - start_time) * 1000
+                    for scheduler_name, image in zip(names, images):
+                        full_path = output_paths[scheduler_name]
+                        future = save_executor.submit(image.save, full_path, format="PNG", compress_level=_PNG_COMPRESS_LEVEL)
+                        pending_saves.append((scheduler_name, full_path, future, wall_ms))
+        
+        # CUDA graphs replace the UNet forward, so they can't stack with the caches that hook it
+        graph_runner = None
+        if cuda_graphs:
+            if (getattr(_pipe, "unet", None) is None or deepcache_helper is not None
+                    or getattr(_pipe, "_is_compiled", False)):
+                print("CUDA graphs need an uncompiled UNet pipeline without DeepCache, running eagerly")
+            else:
+                graph_runner = _UNetGraphRunner(_pipe.unet)
+        
+        # Decoded images go through staging buffers before being handed to the encoders:
+        # pinned host memory for the thread pool, or shared memory blocks that encoder
+        # processes read in place without pickling the pixels
+        shm_blocks = []
+        encoder_pool = None
+        if encoder_processes:
+            shm_blocks = [shared_memory.SharedMemory(create=True, size=height * width * 3) for _ in range(_SAVE_WORKERS)]
+            staging_buffers = [torch.frombuffer(block.buf, dtype=torch.uint8).view(height, width, 3) for block in shm_blocks]
+            encoder_pool = ProcessPoolExecutor(max_workers=_SAVE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            staging_buffers = _get_staging_buffers(height, width)
+        staging_slots = [[buffer, None] for buffer in staging_buffers]
+        
+        # Loop through each scheduler
+        for index, scheduler_name in enumerate(serial_schedulers):
+            print(f"Generating image with scheduler: {scheduler_name}")
             
-            # Save image
-            image.save(full_path)
+            try:
+                # Swap in the prebuilt scheduler
+                _pipe.scheduler = _get_scheduler_instance(scheduler_name)
+                
+                # Enable DeepCache per scheduler so cached features never leak across solvers
+                deepcache_active = deepcache_helper is not None and scheduler_name not in DEEPCACHE_UNSUPPORTED
+                if deepcache_active:
+                    deepcache_helper.enable()
+                
+                # First-block cache also keeps per-run residuals, so scope it to this scheduler
+                fbcache_transformer = _enable_first_block_cache() if use_fbcache else None
+                
+                graph_active = graph_runner is not None and scheduler_name not in CUDA_GRAPH_UNSUPPORTED
+                if graph_active:
+                    graph_runner.install()
+                
+                # Run inference
+                start_time = time.perf_counter()
+                try:
+                    latents = _pipe(
+                        num_inference_steps=num_inference_steps,
+                        guidance_scale=guidance_scale,
+                        height=height,
+                        width=width,
+                        output_type="latent",
+                        **prompt_embeds
+                    ).images
+                finally:
+                    if deepcache_active:
+                        deepcache_helper.disable()
+                    if fbcache_transformer is not None:
+                        fbcache_transformer.disable_cache()
+                    if graph_active:
+                        graph_runner.uninstall()
+                
+                full_path = output_paths[scheduler_name]
+                
+                # Reuse a staging slot once its previous image has been written
+                slot = staging_slots[index % len(staging_slots)]
+                if slot[1] is not None:
+                    wait([slot[1]])
+                image = _decode_latents_to_uint8(latents)
+                if encoder_pool is not None:
+                    slot[0].copy_(image)
+                    wall_ms = (time.perf_counter() - start_time) * 1000
+                    shm_name = shm_blocks[index % len(shm_blocks)].name
+                    slot[1] = encoder_pool.submit(_encode_shared_png, shm_name, (height, width, 3), full_path)
+                else:
+                    slot[0].copy_(image, non_blocking=True)
+                    copy_done = torch.cuda.Event()
+                    copy_done.record()
+                    wall_ms = (time.perf_counter() - start_time) * 1000
+                    slot[1] = save_executor.submit(_save_staged_image, slot[0], copy_done, full_path)
+                pending_saves.append((scheduler_name, full_path, slot[1], wall_ms))
+                
+            except Exception as e:
+                print(f"Error with scheduler {scheduler_name}: {e}")
+                continue
+        
+        # Per-image metadata is collected column-wise for the Parquet manifest
+        manifest = {"scheduler": [], "path": [], "steps": [], "guidance": [], "resolution": [], "wall_ms": []}
+        
+        save_executor.shutdown(wait=True)
+        if encoder_pool is not None:
+            encoder_pool.shutdown(wait=True)
+            # Drop the tensor views before releasing the shared memory they point into
+            staging_buffers.clear()
+            for slot in staging_slots:
+                slot[0] = None
+            for block in shm_blocks:
+                block.close()
+                block.unlink()
+        for scheduler_name, full_path, future, wall_ms in pending_saves:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error saving image for scheduler {scheduler_name}: {e}")
+                continue
             results[scheduler_name] = full_path
             print(f"Saved: {full_path}")
-            
-        except Exception as e:
-            print(f"Error with scheduler {scheduler_name}: {e}")
-            continue
-    
-    # Restore original scheduler
-    _pipe.scheduler = original_scheduler
-    
-    return results
+            manifest["scheduler"].append(scheduler_name)
+            manifest["path"].append(full_path)
+            manifest["steps"].append(num_inference_steps)
+            manifest["guidance"].append(guidance_scale)
+            manifest["resolution"].append(f"{width}x{height}")
+            manifest["wall_ms"].append(wall_ms)
+        
+        if results:
+            _write_manifest(manifest, output_dir)
+        
+        return results
+    finally:
+        # Restore original scheduler and VAE precision
+        _pipe.scheduler = original_scheduler
+        _restore_vae_dtype(vae_dtype)
 
 def generate_image_with_scheduler(
     prompt: str,
@@ -217,10 +808,8 @@ def generate_image_with_scheduler(
     try:
         print(f"Generating image with scheduler: {scheduler_name}")
         
-        # Replace scheduler
-        SchedulerClass = SCHEDULERS[scheduler_name]
-        scheduler = SchedulerClass.from_config(_pipe.scheduler.config)
-        _pipe.scheduler = scheduler
+        # Swap in the prebuilt scheduler
+        _pipe.scheduler = _get_scheduler_instance(scheduler_name)
         
         # Run inference
         image = _pipe(
@@ -233,10 +822,7 @@ def generate_image_with_scheduler(
         ).images[0]
         
         # Generate filename
-        sanitized_prompt = "".join(c for c in prompt[:30] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        sanitized_prompt = sanitized_prompt.replace(' ', '_').lower()
-        filename = f"{filename_prefix}_{sanitized_prompt}_{scheduler_name.lower()}_{num_inference_steps}steps.png"
-        full_path = os.path.join(output_dir, filename)
+        full_path = _build_output_path(output_dir, filename_prefix, prompt, scheduler_name, num_inference_steps)
         
         # Save image
         image.save(full_path)
@@ -9,103 +9,340 @@ This provides a user-friendly web interface for all FastAPI endpoints including:
 - File management and downloads
 """
 
+import asyncio
+import functools
+import threading
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import io
 from PIL import Image
 import time
-import os
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration
 API_BASE_URL = "http://localhost:8000"
 STREAMLIT_PORT = 8501
 
+def create_session() -> requests.Session:
+    """Create a pooled keep-alive session for talking to the FastAPI service."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        # Ride out transient backend failures (GPU busy, restart) with exponential backoff.
+        # Connect errors are retried for every method because the request never reached
+        # the server; read and status retries are limited to GET so a POST that started
+        # an expensive, non-idempotent GPU job is never re-sent.
+        max_retries=Retry(
+            total=3,
+            connect=3,
+            read=2,
+            status_forcelist=(502, 503, 504),
+            backoff_factor=0.5,
+            allowed_methods=frozenset({"GET"})
+        )
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "stable-diffusion-studio"})
+    return session
+
+# Failures a UI call can hit: network/HTTP errors, bad JSON, undecodable images
+_CLIENT_ERRORS = (requests.RequestException, ValueError, OSError)
+
+def _json(response):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+def _post_json(session: requests.Session, url: str, payload: Dict[str, Any], **kwargs):
+    """POST a JSON body, serializing with orjson when it is installed."""
+    if orjson is not None:
+        return session.post(url, data=orjson.dumps(payload), headers={"Content-Type": "application/json"}, **kwargs)
+    return session.post(url, json=payload, **kwargs)
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, kept alive across reruns."""
+    return create_session()
+
+@st.cache_resource
+def get_health_session() -> requests.Session:
+    """
+    Return a session without retries for /health probes.
+    
+    The shared session's backoff would stretch a refused or hung API to
+    several seconds; a probe should answer within its own timeout.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_schedulers(api_base: str) -> tuple:
+    """Fetch the scheduler list; it only changes when the service is redeployed."""
+    response = get_session().get(f"{api_base}/schedulers")
+    if response.status_code == 200:
+        return tuple(_json(response).get("schedulers", []))
+    return ()
+
+def _filenames_from_listing(payload: Dict[str, Any]) -> tuple:
+    """
+    Extract filenames from a /files response.
+    
+    The service groups entries by output directory,
+    {"files": {dir: [{"filename": ..., ...}, ...]}}, newest first within each;
+    names are de-duplicated in that order.
+    """
+    files = payload.get("files", {})
+    if isinstance(files, list):
+        # Flat list of names or entries
+        entries = files
+    elif isinstance(files, dict):
+        entries = [entry for directory_files in files.values() for entry in directory_files or ()]
+    else:
+        return ()
+    names = (entry.get("filename") if isinstance(entry, dict) else entry for entry in entries)
+    return tuple(dict.fromkeys(str(name) for name in names if name))
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _fetch_files(api_base: str) -> tuple:
+    """Fetch generated filenames; cleared whenever a new file is produced."""
+    response = get_session().get(f"{api_base}/files")
+    if response.status_code == 200:
+        return _filenames_from_listing(_json(response))
+    return ()
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _fetch_bytes(api_base: str, filename: str, fmt: str = "png") -> bytes:
+    """
+    Fetch raw image bytes, keeping the 128 most recent files across reruns.
+    
+    fmt="webp" asks the API for a much smaller lossy copy, for display only;
+    anything offered through a download button should stay png.
+    
+    Failed downloads raise instead of returning, so they are never cached.
+    The body is streamed into a buffer sized from Content-Length rather than
+    accumulated chunk by chunk.
+    """
+    params = {"fmt": fmt, "q": 85} if fmt != "png" else None
+    with get_session().get(f"{api_base}/download/{filename}", params=params, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        length = int(response.headers.get("Content-Length", 0))
+        if not length or response.headers.get("Content-Encoding"):
+            return response.content
+        
+        buffer = memoryview(bytearray(length))
+        offset = 0
+        for chunk in response.iter_content(chunk_size=65536):
+            buffer[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        return bytes(buffer[:offset])
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _fetch_batch(api_base: str, filenames: tuple) -> dict:
+    """
+    Fetch several full-size images as one ZIP from /download-batch, cached per file set.
+    
+    Callers pass a sorted tuple so every rerun of the same gallery page hits the
+    cache. Failed requests raise, so they are never cached.
+    """
+    response = _post_json(get_session(), f"{api_base}/download-batch", {"filenames": list(filenames)}, timeout=60)
+    response.raise_for_status()
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        names = set(archive.namelist())
+        return {name: archive.read(name) if name in names else b"" for name in filenames}
+
+def _shrink_to_jpeg(raw: bytes, w: int) -> bytes:
+    """Resize encoded image bytes to fit a w x w box and re-encode them as JPEG."""
+    img = Image.open(io.BytesIO(raw))
+    img.thumbnail((w, w), Image.LANCZOS)
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _fetch_thumbnail(api_base: str, filename: str, w: int) -> bytes:
+    """
+    Fetch a small WebP preview, resizing client-side if the API has no /thumbnail.
+    """
+    response = get_session().get(f"{api_base}/thumbnail/{filename}", params={"w": w, "fmt": "webp"})
+    if response.status_code == 200:
+        return response.content
+    
+    # Fallback for older services: shrink the full image once and cache the result
+    return _shrink_to_jpeg(_fetch_bytes(api_base, filename), w)
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _cached_compare(api_base: str, prompt: str, schedulers: tuple, steps: int, guidance: float, prefix: str) -> dict:
+    """
+    Run a scheduler comparison once per distinct set of inputs.
+    
+    Identical resubmissions within the hour return the earlier result instead of
+    queuing another GPU run. Failed runs raise, so they are never cached.
+    """
+    params = {
+        "prompt": prompt,
+        "schedulers_to_test": list(schedulers),
+        "num_inference_steps": steps,
+        "guidance_scale": guidance,
+        "filename_prefix": prefix
+    }
+    response = _post_json(get_session(), f"{api_base}/test-schedulers", params)
+    response.raise_for_status()
+    _fetch_files.clear()
+    return _json(response)
+
 class StableDiffusionUI:
     def __init__(self):
         self.api_base = API_BASE_URL
+        # One session for all calls so TCP connections are reused across requests and reruns
+        self.session = get_session()
         
     def check_api_health(self):
         """Check if the FastAPI service is running."""
         try:
-            response = requests.get(f"{self.api_base}/health", timeout=5)
+            response = get_health_session().get(f"{self.api_base}/health", timeout=2)
             return response.status_code == 200
-        except:
+        except requests.RequestException:
             return False
     
     def get_available_schedulers(self):
         """Get list of available schedulers."""
         try:
-            response = requests.get(f"{self.api_base}/schedulers")
-            if response.status_code == 200:
-                return response.json().get("schedulers", [])
-        except:
-            pass
+            return list(_fetch_schedulers(self.api_base))
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Could not fetch schedulers: {e}")
         return []
     
     def get_available_files(self):
-        """Get list of generated files."""
+        """Get the generated filenames as an immutable tuple."""
         try:
-            response = requests.get(f"{self.api_base}/files")
-            if response.status_code == 200:
-                data = response.json()
-                files = data.get("files", [])
-                # Ensure we return a list of strings
-                if isinstance(files, list):
-                    return [str(f) for f in files if f]
-                else:
-                    return []
-        except Exception as e:
-            st.error(f"Error fetching files: {e}")
-        return []
+            return _fetch_files(self.api_base)
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error fetching files: {e}")
+        return ()
+    
+    def _post_and_invalidate(self, endpoint: str, params: Dict[str, Any]):
+        """POST to an endpoint that writes files and drop the cached file list on success."""
+        response = _post_json(self.session, f"{self.api_base}{endpoint}", params)
+        if response.status_code != 200:
+            return None
+        _fetch_files.clear()
+        return _json(response)
     
     def generate_image(self, params: Dict[str, Any]):
         """Generate image using basic endpoint."""
         try:
-            response = requests.post(f"{self.api_base}/generate", json=params)
-            return response.json() if response.status_code == 200 else None
-        except Exception as e:
-            st.error(f"Error generating image: {e}")
+            return self._post_and_invalidate("/generate", params)
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error generating image: {e}")
             return None
     
     def generate_with_scheduler(self, params: Dict[str, Any]):
         """Generate image with specific scheduler."""
         try:
-            response = requests.post(f"{self.api_base}/generate-scheduler", json=params)
-            return response.json() if response.status_code == 200 else None
-        except Exception as e:
-            st.error(f"Error generating image with scheduler: {e}")
+            return self._post_and_invalidate("/generate-scheduler", params)
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error generating image with scheduler: {e}")
             return None
     
     def test_schedulers(self, params: Dict[str, Any]):
         """Test multiple schedulers."""
         try:
-            response = requests.post(f"{self.api_base}/test-schedulers", json=params)
-            return response.json() if response.status_code == 200 else None
-        except Exception as e:
-            st.error(f"Error testing schedulers: {e}")
+            return self._post_and_invalidate("/test-schedulers", params)
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error testing schedulers: {e}")
+            return None
+    
+    def compare_schedulers(self, params: Dict[str, Any]):
+        """Test multiple schedulers, reusing the result of an identical earlier comparison."""
+        try:
+            return _cached_compare(
+                self.api_base,
+                params["prompt"],
+                # Sorted so the same selection in a different order hits the cache
+                tuple(sorted(params["schedulers_to_test"])),
+                params["num_inference_steps"],
+                params["guidance_scale"],
+                params["filename_prefix"]
+            )
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error testing schedulers: {e}")
             return None
     
     def upscale_image(self, params: Dict[str, Any]):
         """Upscale a single image."""
         try:
-            response = requests.post(f"{self.api_base}/upscale", json=params)
-            return response.json() if response.status_code == 200 else None
-        except Exception as e:
-            st.error(f"Error upscaling image: {e}")
+            return self._post_and_invalidate("/upscale", params)
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error upscaling image: {e}")
             return None
     
-    def download_image(self, filename: str):
-        """Download an image file."""
+    def download_image(self, filename: str, fmt: str = "webp"):
+        """
+        Download an image file for display, as WebP by default to keep the transfer small.
+        
+        Pass fmt="png" wherever image quality is being judged, e.g. comparisons.
+        """
         try:
-            response = requests.get(f"{self.api_base}/download/{filename}")
-            if response.status_code == 200:
-                return Image.open(io.BytesIO(response.content))
-        except Exception as e:
-            st.error(f"Error downloading image: {e}")
+            return Image.open(io.BytesIO(_fetch_bytes(self.api_base, filename, fmt=fmt)))
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error downloading image: {e}")
         return None
 
+    def download_image_with_bytes(self, filename: str):
+        """Download an image once and return it both decoded and as raw bytes."""
+        try:
+            raw = _fetch_bytes(self.api_base, filename)
+            return Image.open(io.BytesIO(raw)), raw
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error downloading image: {e}")
+        return None, b""
+    
+    def download_thumbnail(self, filename: str, w: int = 300):
+        """Download an encoded preview that fits in a w x w box, ready for st.image."""
+        try:
+            return _fetch_thumbnail(self.api_base, filename, w)
+        except _CLIENT_ERRORS as e:
+            st.toast(f"Error downloading thumbnail: {e}")
+        return None
+
+    def download_many(self, filenames: List[str]) -> Dict[str, bytes]:
+        """Download several image files in one cached request, keyed by filename."""
+        try:
+            batch = _fetch_batch(self.api_base, tuple(sorted(filenames)))
+            return {name: batch.get(name, b"") for name in filenames}
+        except (*_CLIENT_ERRORS, zipfile.BadZipFile):
+            pass
+        # Older service without /download-batch: fall back to one GET per file
+        return {name: download_image_bytes(self, name) for name in filenames}
+
+HEALTH_CHECK_TTL = 10  # seconds
+
+def _healthy(ui):
+    """Return the API health, reusing the last result from this session for a few seconds."""
+    now = time.time()
+    last = st.session_state.get("_hc")
+    if last and now - last[0] < HEALTH_CHECK_TTL:
+        return last[1]
+    ok = ui.check_api_health()
+    st.session_state["_hc"] = (now, ok)
+    return ok
+
 def main():
     st.set_page_config(
         page_title="Stable Diffusion Studio",
@@ -122,7 +359,7 @@ def main():
     st.markdown("**Interactive AI Image Generation & Processing**")
     
     # Check API health
-    if not ui.check_api_health():
+    if not _healthy(ui):
         st.error("🚨 FastAPI service is not running! Please start the service first.")
         st.code("./deploy.sh start")
         st.stop()
@@ -339,6 +576,7 @@ def compare_schedulers_tab(ui):
             guidance_scale = st.slider("Guidance Scale", 1.0, 20.0, 7.5, 0.5)
         with col1_2:
             filename_prefix = st.text_input("Filename prefix:", value="comparison")
+            force_regenerate = st.checkbox("🔁 Force regenerate", help="Ignore cached results for identical settings")
         
         if st.button("🔍 Compare Schedulers", type="primary", use_container_width=True):
             if not prompt.strip():
@@ -356,8 +594,11 @@ def compare_schedulers_tab(ui):
                 "filename_prefix": filename_prefix
             }
             
+            if force_regenerate:
+                _cached_compare.clear()
+            
             with st.spinner(f"🔍 Comparing {len(selected_schedulers)} schedulers..."):
-                result = ui.test_schedulers(params)
+                result = ui.compare_schedulers(params)
             
             if result:
                 st.success(f"✅ Scheduler comparison completed!")
@@ -379,26 +620,26 @@ def compare_schedulers_tab(ui):
                         files_dict = result
                     
                     if files_dict:
+                        # Extract filenames from paths if needed
+                        filenames = [file_path.split("/")[-1] for file_path in files_dict.values()]
+                        images, image_bytes, errors = prefetch_images_async(ui, filenames)
+                        _report_errors(errors)
+                        
                         # Display images in columns
                         num_cols = min(3, len(files_dict))
                         cols = st.columns(num_cols)
                         
-                        for i, (scheduler_name, file_path) in enumerate(files_dict.items()):
+                        for i, ((scheduler_name, file_path), filename) in enumerate(zip(files_dict.items(), filenames)):
                             with cols[i % num_cols]:
                                 st.markdown(f"**{scheduler_name}**")
                                 
-                                # Extract filename from path if needed
-                                filename = file_path
-                                if "/" in file_path:
-                                    filename = file_path.split("/")[-1]
-                                
-                                # Try to download and display the image
-                                img = ui.download_image(filename)
+                                # Display the prefetched thumbnail bytes
+                                img = images[filename]
                                 if img:
-                                    st.image(img, use_column_width=True)
+                                    st.image(img, width=300)
                                     st.download_button(
                                         f"⬇️ Download",
-                                        data=download_image_bytes(ui, filename),
+                                        data=image_bytes[filename],
                                         file_name=filename,
                                         mime="image/png",
                                         key=f"download_{scheduler_name}_{i}"
@@ -444,11 +685,15 @@ def upscale_images_tab(ui):
         if files:
             selected_file = st.selectbox("📁 Select image to upscale:", files)
             
-            # Display selected image
+            # Display a thumbnail of the selected image, kept in session state across slider reruns
             if selected_file:
-                img = ui.download_image(selected_file)
-                if img:
-                    st.image(img, caption=f"Original: {selected_file}", width=300)
+                cached = st.session_state.get("upscale_preview")
+                if cached is None or cached[0] != selected_file:
+                    cached = (selected_file, ui.download_thumbnail(selected_file))
+                    st.session_state["upscale_preview"] = cached
+                preview = cached[1]
+                if preview:
+                    st.image(preview, caption=f"Original: {selected_file}", width=300)
         else:
             st.warning("No images available. Generate some images first!")
             return
@@ -486,17 +731,19 @@ def upscale_images_tab(ui):
                 
                 with col_before:
                     st.markdown("**Before (Original)**")
+                    # Lossless like the "After" panel, so the comparison is fair
+                    img = ui.download_image(selected_file, fmt="png")
                     if img:
                         st.image(img, use_column_width=True)
                 
                 with col_after:
                     st.markdown("**After (Upscaled)**")
-                    upscaled_img = ui.download_image(result['upscaled_filename'])
+                    upscaled_img, upscaled_bytes = ui.download_image_with_bytes(result['upscaled_filename'])
                     if upscaled_img:
-                        st.image(upscaled_img, use_column_width=True)
+                        st.image(upscaled_bytes, use_column_width=True)
                         st.download_button(
                             "⬇️ Download Upscaled",
-                            data=download_image_bytes(ui, result['upscaled_filename']),
+                            data=upscaled_bytes,
                             file_name=result['upscaled_filename'],
                             mime="image/png"
                         )
@@ -526,8 +773,8 @@ def file_management_tab(ui):
     
     files = ui.get_available_files()
     
-    # Handle case where files might not be a list or might be None
-    if not files or not isinstance(files, list):
+    # Handle case where files might not be a sequence or might be None
+    if not files or not isinstance(files, (list, tuple)):
         st.info("No images generated yet. Create some images first!")
         return
     
@@ -559,14 +806,26 @@ def file_management_tab(ui):
         
     current_files = files[start_idx:end_idx]
     
+    # Page results are kept in session_state keyed by their filename tuple, so a
+    # rerun of this page or a flip to the prefetched next page reuses them;
+    # otherwise fetch the whole page concurrently, then render the grid
+    prefetched = st.session_state.get("_prefetch", {})
+    current_key = tuple(current_files)
+    pending = prefetched.get(current_key)
+    if pending is None:
+        pending = Future()
+        pending.set_result(prefetch_images(ui, current_files))
+    images, image_bytes, errors = pending.result()
+    _report_errors(errors)
+    
     # Display images in grid
     cols = st.columns(3)
     for i, filename in enumerate(current_files):
         with cols[i % 3]:
             try:
-                img = ui.download_image(filename)
+                img = images[filename]
                 if img:
-                    st.image(img, caption=filename, use_column_width=True)
+                    st.image(img, caption=filename, width=300)
                     
                     col_btn1, col_btn2 = st.columns(2)
                     with col_btn1:
@@ -575,7 +834,7 @@ def file_management_tab(ui):
                     with col_btn2:
                         st.download_button(
                             "⬇️ Download",
-                            data=download_image_bytes(ui, filename),
+                            data=image_bytes[filename],
                             file_name=filename,
                             mime="image/png",
                             key=f"download_{filename}"
@@ -584,6 +843,18 @@ def file_management_tab(ui):
                     st.error(f"Could not load image: {filename}")
             except Exception as e:
                 st.error(f"Error displaying {filename}: {str(e)}")
+    
+    # Keep this page (unless it had errors, so a rerun retries) and start
+    # fetching the next one while the user looks at this one
+    kept = {} if errors else {current_key: pending}
+    next_files = tuple(files[end_idx:end_idx + items_per_page])
+    if next_files:
+        next_pending = prefetched.get(next_files)
+        if next_pending is None:
+            # The submitted call carries this run's context so its cached calls work off-thread
+            next_pending = _prefetch_executor().submit(_with_script_ctx(prefetch_images), ui, next_files)
+        kept[next_files] = next_pending
+    st.session_state["_prefetch"] = kept
 
 def about_tab():
     """About and help information."""
@@ -616,6 +887,8 @@ def about_tab():
     - `POST /upscale` - Image upscaling
     - `GET /files` - File listing
     - `GET /download/{filename}` - Image download
+    - `POST /download-batch` - Multi-image download as one ZIP
+    - `GET /thumbnail/{filename}` - Gallery previews
     - `GET /schedulers` - Available schedulers
     - `GET /health` - Service health check
     
@@ -639,12 +912,13 @@ def about_tab():
 
 def display_generated_image(ui, filename):
     """Display a generated image with download option."""
-    img = ui.download_image(filename)
+    img, raw = ui.download_image_with_bytes(filename)
     if img:
-        st.image(img, caption=filename, use_column_width=True)
+        # Pass the already-encoded bytes so Streamlit doesn't re-encode the PIL image
+        st.image(raw, caption=filename, use_column_width=True)
         st.download_button(
             "⬇️ Download Image",
-            data=download_image_bytes(ui, filename),
+            data=raw,
             file_name=filename,
             mime="image/png"
         )
@@ -652,11 +926,11 @@ def display_generated_image(ui, filename):
 def display_image_details(ui, filename):
     """Display detailed view of an image."""
     st.subheader(f"🔍 {filename}")
-    img = ui.download_image(filename)
+    img, raw = ui.download_image_with_bytes(filename)
     if img:
         col1, col2 = st.columns([2, 1])
         with col1:
-            st.image(img, use_column_width=True)
+            st.image(raw, use_column_width=True)
         with col2:
             st.markdown(f"**Filename:** {filename}")
             st.markdown(f"**Size:** {img.size[0]} x {img.size[1]}")
@@ -664,18 +938,114 @@ def display_image_details(ui, filename):
             
             st.download_button(
                 "⬇️ Download Full Size",
-                data=download_image_bytes(ui, filename),
+                data=raw,
                 file_name=filename,
                 mime="image/png"
             )
 
+@st.cache_resource
+def _prefetch_executor() -> ThreadPoolExecutor:
+    """Background pool that loads the next gallery page ahead of a page flip."""
+    return ThreadPoolExecutor(max_workers=4)
+
+def _with_script_ctx(fn):
+    """
+    Wrap fn so it runs under the calling script's ScriptRunContext in any thread.
+    
+    Without the context, st.cache_data calls from worker threads log
+    "missing ScriptRunContext" warnings.
+    """
+    ctx = get_script_run_ctx()
+    
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+    
+    return run
+
+def _report_errors(errors):
+    """Show errors collected by worker threads; only the script thread can reach the page."""
+    for message in errors:
+        st.toast(message)
+
+def prefetch_images(ui, filenames, max_workers: int = 8, w: int = 300):
+    """
+    Download thumbnails and full-size bytes for several files concurrently.
+    
+    Worker threads never call st.toast; their errors are returned so the
+    script thread can report them with _report_errors.
+    
+    Returns:
+        Tuple of ({filename: thumbnail bytes or None}, {filename: bytes}, [error messages])
+        so grid tiles can render without waiting on one HTTP round trip each.
+    """
+    errors = []
+    
+    def thumbnail(filename):
+        try:
+            return _fetch_thumbnail(ui.api_base, filename, w)
+        except _CLIENT_ERRORS as e:
+            errors.append(f"Error downloading thumbnail {filename}: {e}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Full-size bytes come back in one batch request alongside the thumbnails
+        bytes_future = executor.submit(_with_script_ctx(ui.download_many), filenames)
+        image_list = list(executor.map(_with_script_ctx(thumbnail), filenames))
+        return dict(zip(filenames, image_list)), bytes_future.result(), errors
+
+async def _afetch_all(urls, max_connections: int = 16):
+    """Fetch every URL concurrently over one async client, returning bytes or None per URL."""
+    import httpx
+    from importlib.util import find_spec
+    
+    # HTTP/2 multiplexing needs the optional h2 package
+    limits = httpx.Limits(max_connections=max_connections)
+    async with httpx.AsyncClient(http2=find_spec("h2") is not None, limits=limits, timeout=30) as client:
+        responses = await asyncio.gather(*(client.get(url) for url in urls), return_exceptions=True)
+    return [
+        r.content if isinstance(r, httpx.Response) and r.status_code == 200 else None
+        for r in responses
+    ]
+
+def prefetch_images_async(ui, filenames, w: int = 300):
+    """
+    Download thumbnails and full-size bytes for several files on one event loop.
+    
+    Falls back to the thread pool in prefetch_images when httpx is not installed.
+    
+    Returns:
+        Tuple of ({filename: thumbnail bytes or None}, {filename: bytes}, [error messages])
+    """
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        return prefetch_images(ui, filenames, w=w)
+    
+    thumb_urls = [f"{ui.api_base}/thumbnail/{filename}?w={w}&fmt=webp" for filename in filenames]
+    
+    async def gather_tiles():
+        # Full-size bytes come back in one batch request while the thumbnails stream in
+        return await asyncio.gather(_afetch_all(thumb_urls), asyncio.to_thread(_with_script_ctx(ui.download_many), filenames))
+    
+    thumbs, image_bytes = asyncio.run(gather_tiles())
+    
+    images = {}
+    for filename, thumb in zip(filenames, thumbs):
+        full = image_bytes[filename]
+        if thumb is None and full:
+            # Older service without /thumbnail: shrink the full image locally
+            thumb = _shrink_to_jpeg(full, w)
+        images[filename] = thumb
+    return images, image_bytes, []
+
 def download_image_bytes(ui, filename):
     """Get image as bytes for download."""
     try:
-        response = requests.get(f"{ui.api_base}/download/{filename}")
-        if response.status_code == 200:
-            return response.content
-    except:
+        return _fetch_bytes(ui.api_base, filename)
+    except _CLIENT_ERRORS:
         pass
     return b""
 
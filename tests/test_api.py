@@ -5,32 +5,95 @@ Comprehensive API Test Suite for Stable Diffusion Service
 This script tests all endpoints and functionality of the API.
 """
 
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import os
 import sys
-from typing import Dict, Any, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+# /schedulers is static per server build, so repeated runs revalidate this copy
+SCHEDULERS_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "sd-api-test", "schedulers.json")
 
 class APITester:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(self, base_url: str = "http://localhost:8000", results_path: Optional[str] = None):
         self.base_url = base_url
-        self.test_results = []
+        # Results optionally stream to line-delimited JSON as tests finish; only
+        # counters and the (few) failures stay in memory for the summary
+        self.results_path = results_path
+        self._passed = 0
+        self._failed = 0
+        self._failures: List[Dict[str, Any]] = []
+        if self.results_path:
+            open(self.results_path, "w").close()
+        # Endpoint URLs and shared payload fields, built once
+        self.url_health = f"{base_url}/health"
+        self.url_root = f"{base_url}/"
+        self.url_schedulers = f"{base_url}/schedulers"
+        self.url_generate = f"{base_url}/generate"
+        self.url_generate_scheduler = f"{base_url}/generate-scheduler"
+        self.url_test_schedulers = f"{base_url}/test-schedulers"
+        self.url_upscale = f"{base_url}/upscale"
+        self.url_upscale_highres = f"{base_url}/upscale-highres"
+        self.url_files = f"{base_url}/files"
+        self.url_download = f"{base_url}/download/"
+        self._gen_payload_base = {
+            "num_inference_steps": 10,
+            "guidance_scale": 7.0,
+            "height": 512,
+            "width": 512
+        }
+        # Tests in a concurrent group log from worker threads
+        self._results_lock = threading.Lock()
+        # One keep-alive session so every test reuses the same TCP connection
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+    
+    def close(self):
+        """Close the pooled HTTP session."""
+        self.session.close()
+        
+    def _read_json_field(self, response: requests.Response, field: str, default: Any) -> Any:
+        """
+        Read one top-level field from a streamed JSON response.
         
+        With ijson installed the field is parsed straight off the socket without
+        building the rest of the body; otherwise the whole body is decoded.
+        """
+        try:
+            import ijson
+        except ImportError:
+            return response.json().get(field, default)
+        
+        with response:
+            response.raw.decode_content = True
+            return next(ijson.items(response.raw, field), default)
+    
     def log_test(self, test_name: str, success: bool, message: str = ""):
         """Log test results."""
         status = "✓" if success else "✗"
-        print(f"{status} {test_name}: {message}")
-        self.test_results.append({
-            "test": test_name,
-            "success": success,
-            "message": message
-        })
+        result = {"test": test_name, "success": success, "message": message}
+        with self._results_lock:
+            print(f"{status} {test_name}: {message}")
+            if self.results_path:
+                with open(self.results_path, "a") as f:
+                    f.write(json.dumps(result) + "\n")
+            if not success:
+                self._failures.append(result)
+            self._passed += int(success)
+            self._failed += int(not success)
         
     def test_health(self) -> bool:
         """Test health endpoint."""
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=10)
+            response = self.session.get(self.url_health, timeout=10)
             if response.status_code == 200:
                 self.log_test("Health Check", True, "API is healthy")
                 return True
@@ -44,7 +107,7 @@ class APITester:
     def test_root_endpoint(self) -> bool:
         """Test root endpoint."""
         try:
-            response = requests.get(f"{self.base_url}/", timeout=10)
+            response = self.session.get(self.url_root, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 self.log_test("Root Endpoint", True, f"Version: {data.get('version', 'N/A')}")
@@ -56,12 +119,38 @@ class APITester:
             self.log_test("Root Endpoint", False, f"Error: {e}")
             return False
     
+    def _load_schedulers_cache(self) -> Dict[str, Any]:
+        """Load the cached /schedulers response for this server, if any."""
+        try:
+            with open(SCHEDULERS_CACHE_FILE) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache if cache.get("base_url") == self.base_url else {}
+    
+    def _save_schedulers_cache(self, etag: str, data: Dict[str, Any]):
+        """Persist a /schedulers response and its ETag for the next run."""
+        try:
+            os.makedirs(os.path.dirname(SCHEDULERS_CACHE_FILE), exist_ok=True)
+            with open(SCHEDULERS_CACHE_FILE, "w") as f:
+                json.dump({"base_url": self.base_url, "etag": etag, "data": data}, f)
+        except OSError:
+            pass
+    
     def test_list_schedulers(self) -> bool:
-        """Test scheduler listing."""
+        """Test scheduler listing, revalidating a cached copy from earlier runs."""
         try:
-            response = requests.get(f"{self.base_url}/schedulers", timeout=10)
+            cache = self._load_schedulers_cache()
+            headers = {"If-None-Match": cache["etag"]} if cache.get("etag") else {}
+            response = self.session.get(self.url_schedulers, headers=headers, timeout=10)
+            if response.status_code == 304:
+                count = len(cache["data"].get('schedulers', []))
+                self.log_test("List Schedulers", True, f"Found {count} schedulers (cached)")
+                return True
             if response.status_code == 200:
                 data = response.json()
+                if response.headers.get("ETag"):
+                    self._save_schedulers_cache(response.headers["ETag"], data)
                 count = len(data.get('schedulers', []))
                 self.log_test("List Schedulers", True, f"Found {count} schedulers")
                 return True
@@ -75,16 +164,10 @@ class APITester:
     def test_image_generation(self) -> Dict[str, Any]:
         """Test basic image generation."""
         try:
-            payload = {
-                "prompt": "a simple test image, digital art",
-                "num_inference_steps": 10,
-                "guidance_scale": 7.0,
-                "height": 512,
-                "width": 512
-            }
+            payload = {**self._gen_payload_base, "prompt": "a simple test image, digital art"}
             
-            response = requests.post(
-                f"{self.base_url}/generate", 
+            response = self.session.post(
+                self.url_generate, 
                 json=payload, 
                 timeout=120
             )
@@ -105,26 +188,25 @@ class APITester:
         """Test image generation with automatic upscaling."""
         try:
             payload = {
+                **self._gen_payload_base,
                 "prompt": "a beautiful landscape, digital art",
                 "num_inference_steps": 15,
                 "guidance_scale": 7.5,
-                "height": 512,
-                "width": 512,
                 "upscale": True,
                 "upscale_prompt": "enhance details, high quality"
             }
             
-            response = requests.post(
-                f"{self.base_url}/generate", 
+            response = self.session.post(
+                self.url_generate, 
                 json=payload, 
+                stream=True,
                 timeout=180
             )
             
             if response.status_code == 200:
-                data = response.json()
-                filename = data.get('filename', '')
+                filename = self._read_json_field(response, 'filename', '')
                 self.log_test("Generation + Upscaling", True, f"Generated and upscaled: {filename}")
-                return data
+                return {"filename": filename}
             else:
                 self.log_test("Generation + Upscaling", False, f"Status: {response.status_code}")
                 return {}
@@ -146,8 +228,8 @@ class APITester:
                 "guidance_scale": 7.5
             }
             
-            response = requests.post(
-                f"{self.base_url}/upscale", 
+            response = self.session.post(
+                self.url_upscale, 
                 json=payload, 
                 timeout=120
             )
@@ -179,8 +261,8 @@ class APITester:
                 "use_swinir": False  # Set to True if SwinIR is available
             }
             
-            response = requests.post(
-                f"{self.base_url}/upscale-highres", 
+            response = self.session.post(
+                self.url_upscale_highres, 
                 json=payload, 
                 timeout=150
             )
@@ -199,26 +281,33 @@ class APITester:
     
     def test_scheduler_comparison(self) -> bool:
         """Test scheduler comparison."""
+        return self.test_scheduler_sweep(["EulerDiscrete", "DDIM"])
+    
+    def test_scheduler_sweep(self, schedulers: List[str]) -> bool:
+        """
+        Test a set of schedulers with one /test-schedulers request.
+        
+        Prefer this over looping test_single_scheduler_generation: the server
+        runs the whole sweep in one call and reuses its pipeline setup.
+        """
         try:
             payload = {
+                **self._gen_payload_base,
                 "prompt": "a test image for scheduler comparison",
-                "schedulers_to_test": ["EulerDiscrete", "DDIM"],
+                "schedulers_to_test": list(schedulers),
                 "num_inference_steps": 20,
-                "guidance_scale": 7.0,
-                "height": 512,
-                "width": 512,
                 "filename_prefix": "test_scheduler"
             }
             
-            response = requests.post(
-                f"{self.base_url}/test-schedulers", 
+            response = self.session.post(
+                self.url_test_schedulers, 
                 json=payload, 
-                timeout=180
+                stream=True,
+                timeout=max(180, 90 * len(schedulers))
             )
             
             if response.status_code == 200:
-                data = response.json()
-                count = data.get('total_generated', 0)
+                count = self._read_json_field(response, 'total_generated', 0)
                 self.log_test("Scheduler Comparison", True, f"Generated {count} images")
                 return True
             else:
@@ -235,36 +324,55 @@ class APITester:
             return False
             
         try:
-            response = requests.get(
-                f"{self.base_url}/download/{filename}", 
+            with self.session.get(
+                self.url_download + filename, 
+                stream=True,
+                timeout=30
+            ) as response:
+                if response.status_code != 200:
+                    self.log_test("File Download", False, f"Status: {response.status_code}")
+                    return False
+                
+                # Count the body in chunks rather than holding the whole image in memory
+                size = 0
+                for chunk in response.iter_content(chunk_size=65536):
+                    size += len(chunk)
+                etag = response.headers.get("ETag")
+            self.log_test("File Download", True, f"Downloaded {size} bytes")
+        except Exception as e:
+            self.log_test("File Download", False, f"Error: {e}")
+            return False
+        
+        # Revalidating the file just fetched must come back as a bodyless 304
+        if not etag:
+            self.log_test("Conditional Download", False, "No ETag on download response")
+            return False
+        try:
+            response = self.session.get(
+                self.url_download + filename,
+                headers={"If-None-Match": etag},
                 timeout=30
             )
-            
-            if response.status_code == 200:
-                size = len(response.content)
-                self.log_test("File Download", True, f"Downloaded {size} bytes")
+            if response.status_code == 304 and not response.content:
+                self.log_test("Conditional Download", True, "Not modified (304)")
                 return True
-            else:
-                self.log_test("File Download", False, f"Status: {response.status_code}")
-                return False
+            self.log_test("Conditional Download", False, f"Expected 304, got {response.status_code}")
+            return False
         except Exception as e:
-            self.log_test("File Download", False, f"Error: {e}")
+            self.log_test("Conditional Download", False, f"Error: {e}")
             return False
     
     def test_single_scheduler_generation(self) -> bool:
         """Test single scheduler image generation."""
         try:
             data = {
+                **self._gen_payload_base,
                 "prompt": "a simple test image for scheduler testing",
                 "scheduler_name": "EulerDiscrete",
-                "num_inference_steps": 10,
-                "guidance_scale": 7.0,
-                "height": 512,
-                "width": 512,
                 "filename_prefix": "api_test"
             }
             
-            response = requests.post(f"{self.base_url}/generate-scheduler", json=data, timeout=120)
+            response = self.session.post(self.url_generate_scheduler, json=data, timeout=120)
             
             if response.status_code == 200:
                 result = response.json()
@@ -288,11 +396,23 @@ class APITester:
     def test_files_listing(self) -> bool:
         """Test files listing endpoint."""
         try:
-            response = requests.get(f"{self.base_url}/files", timeout=10)
+            response = self.session.get(self.url_files, timeout=10)
             
             if response.status_code == 200:
                 result = response.json()
                 total_files = result.get('total_files', 0)
+                # The Streamlit gallery reads "filename" from each entry grouped by directory
+                files = result.get('files')
+                if not isinstance(files, dict) or not all(
+                    isinstance(entries, list) and all(isinstance(entry.get('filename'), str) for entry in entries)
+                    for entries in files.values()
+                ):
+                    self.log_test("Files Listing", False, "Expected files as {directory: [{filename, ...}]}")
+                    return False
+                listed = sum(len(entries) for entries in files.values())
+                if listed != total_files:
+                    self.log_test("Files Listing", False, f"total_files {total_files} != {listed} listed entries")
+                    return False
                 self.log_test("Files Listing", True, f"Found {total_files} files")
                 return True
             else:
@@ -303,6 +423,11 @@ class APITester:
             self.log_test("Files Listing", False, f"Error: {e}")
             return False
     
+    def _run_upscale_tests(self, filename: str):
+        """Run both upscaling tests on a generated image, one after the other."""
+        self.test_upscaling(filename)
+        self.test_high_res_upscaling(filename)
+    
     def run_all_tests(self) -> Dict[str, Any]:
         """Run all tests."""
         print("Starting Comprehensive API Test Suite")
@@ -310,29 +435,39 @@ class APITester:
         
         start_time = time.time()
         
-        # Basic connectivity tests
-        if not self.test_health():
-            print("❌ Health check failed - stopping tests")
-            return self.get_results()
-        
-        self.test_root_endpoint()
-        self.test_list_schedulers()
-        
-        # Image generation tests
-        gen_result = self.test_image_generation()
-        test_filename = gen_result.get('filename', '')
-        
-        # Test upscaling if we have a generated image
-        if test_filename:
-            self.test_upscaling(test_filename)
-            self.test_high_res_upscaling(test_filename)
-            self.test_file_download(test_filename)
-        
-        # Advanced tests
-        self.test_image_generation_with_upscaling()
-        self.test_scheduler_comparison()
-        self.test_single_scheduler_generation()
-        self.test_files_listing()
+        try:
+            # Basic connectivity tests
+            if not self.test_health():
+                print("❌ Health check failed - stopping tests")
+                return self.get_results()
+            
+            # Generate → (upscales | download) DAG, with the independent
+            # read-only checks running alongside the first generation
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                checks = [
+                    executor.submit(self.test_root_endpoint),
+                    executor.submit(self.test_list_schedulers),
+                    executor.submit(self.test_files_listing)
+                ]
+                gen_result = executor.submit(self.test_image_generation).result()
+                test_filename = gen_result.get('filename', '')
+                
+                # Tests that only need the generated image: the cheap download overlaps
+                # the GPU-bound upscales, which stay serial so neither waits out its
+                # timeout queued behind the other on a single-GPU server
+                if test_filename:
+                    checks.append(executor.submit(self._run_upscale_tests, test_filename))
+                    checks.append(executor.submit(self.test_file_download, test_filename))
+                
+                for future in checks:
+                    future.result()
+            
+            # Advanced tests
+            self.test_image_generation_with_upscaling()
+            self.test_scheduler_comparison()
+            self.test_single_scheduler_generation()
+        finally:
+            self.close()
         
         end_time = time.time()
         duration = end_time - start_time
@@ -340,18 +475,80 @@ class APITester:
         print(f"\nTest suite completed in {duration:.1f} seconds")
         return self.get_results()
     
+    async def _sweep_async(self, prompts: List[str], concurrency: int) -> List[bool]:
+        """POST every prompt to /generate over one aiohttp session, at most `concurrency` in flight."""
+        import aiohttp
+        
+        connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60)
+        # Requests queue behind each other on the GPU, so bound the read wait, not the total
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=120 * concurrency)
+        
+        async def generate(session, prompt: str) -> bool:
+            try:
+                async with session.post(self.url_generate, json={**self._gen_payload_base, "prompt": prompt}) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        self.log_test("Prompt Sweep", True, f"Generated: {data.get('filename', '')}")
+                        return True
+                    self.log_test("Prompt Sweep", False, f"Status: {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.log_test("Prompt Sweep", False, f"Error: {e}")
+            return False
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            return await asyncio.gather(*(generate(session, prompt) for prompt in prompts))
+    
+    def run_prompt_sweep(self, prompts: List[str], concurrency: int = 4) -> int:
+        """
+        Generate one image per prompt with client-side fan-out.
+        
+        Uses aiohttp (on a uvloop event loop when installed) and falls back to
+        the pooled session on worker threads when aiohttp is not available.
+        
+        Returns:
+            Number of prompts that generated successfully
+        """
+        print(f"\nRunning prompt sweep over {len(prompts)} prompts...")
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            print("aiohttp not installed, sweeping with worker threads")
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                return sum(bool(filename) for filename in executor.map(self._post_generate, prompts))
+        
+        # libuv's event loop trims per-request overhead when many requests are in flight
+        try:
+            import uvloop
+            run = uvloop.run
+        except ImportError:
+            run = asyncio.run
+        return sum(run(self._sweep_async(prompts, concurrency)))
+    
+    def _post_generate(self, prompt: str) -> str:
+        """Generate one image for the sweep fallback and return its filename, or '' on failure."""
+        try:
+            response = self.session.post(self.url_generate, json={**self._gen_payload_base, "prompt": prompt}, timeout=120)
+            if response.status_code == 200:
+                filename = response.json().get('filename', '')
+                self.log_test("Prompt Sweep", True, f"Generated: {filename}")
+                return filename
+            self.log_test("Prompt Sweep", False, f"Status: {response.status_code}")
+        except requests.RequestException as e:
+            self.log_test("Prompt Sweep", False, f"Error: {e}")
+        return ''
+    
     def get_results(self) -> Dict[str, Any]:
         """Get test results summary."""
-        total_tests = len(self.test_results)
-        passed_tests = sum(1 for result in self.test_results if result['success'])
-        failed_tests = total_tests - passed_tests
+        passed_tests = self._passed
+        failed_tests = self._failed
+        total_tests = passed_tests + failed_tests
         
         return {
             "total_tests": total_tests,
             "passed": passed_tests,
             "failed": failed_tests,
             "success_rate": (passed_tests / total_tests * 100) if total_tests > 0 else 0,
-            "results": self.test_results
+            "results_file": self.results_path
         }
     
     def print_summary(self):
@@ -368,9 +565,8 @@ class APITester:
         
         if results['failed'] > 0:
             print("\nFailed Tests:")
-            for result in results['results']:
-                if not result['success']:
-                    print(f"  ❌ {result['test']}: {result['message']}")
+            for result in self._failures:
+                print(f"  ❌ {result['test']}: {result['message']}")
         
         print("=" * 50)
 
@@ -381,12 +577,20 @@ def main():
     
     print(f"Testing API at: {api_url}")
     
-    # Create tester instance
-    tester = APITester(api_url)
+    # Create tester instance; per-test results go to an NDJSON file only when requested
+    tester = APITester(api_url, results_path=os.environ.get("API_TEST_RESULTS"))
     
     # Run tests
     results = tester.run_all_tests()
     
+    # Optional regression sweep: one prompt per line in the given file
+    sweep_file = os.environ.get("API_TEST_SWEEP_PROMPTS")
+    if sweep_file:
+        with open(sweep_file) as f:
+            prompts = [line.strip() for line in f if line.strip()]
+        tester.run_prompt_sweep(prompts)
+        results = tester.get_results()
+    
     # Print summary
     tester.print_summary()
     
@@ -7,9 +7,10 @@ Run this inside the Docker container to verify the setup.
 """
 
 import sys
+import importlib.util
 import platform
-import subprocess
 import os
+from importlib import metadata
 
 def test_python_version():
     """Test Python version and configuration."""
@@ -30,17 +31,21 @@ def test_python_version():
     print(f"Platform: {platform.platform()}")
     print(f"Architecture: {platform.machine()}")
     
-    # Check if we're running Python 3.12
-    if version.major == 3 and version.minor == 12:
-        print("✅ Python 3.12 is correctly installed and running!")
-    else:
+    # Check if we're running Python 3.12; bail out before any package or pip probing if not
+    if version[:2] != (3, 12):
         print(f"❌ Expected Python 3.12, but got {version.major}.{version.minor}")
         return False
+    print("✅ Python 3.12 is correctly installed and running!")
     
+    return _run_deep_checks()
+
+def _run_deep_checks():
+    """Check packages, pip and CUDA; only worth running on the expected interpreter."""
     # Check Python executable paths
     print(f"\nPython Executable: {sys.executable}")
     
-    # Test import of key packages
+    # Check key packages are installed; find_spec locates them on sys.path
+    # without running their (for torch/diffusers, multi-second) module init
     print("\n📦 Testing Key Package Imports...")
     test_packages = [
         'torch',
@@ -53,20 +58,17 @@ def test_python_version():
     ]
     
     for package in test_packages:
-        try:
-            __import__(package)
-            print(f"✅ {package} imported successfully")
-        except ImportError as e:
-            print(f"❌ Failed to import {package}: {e}")
+        if importlib.util.find_spec(package) is not None:
+            print(f"✅ {package} found")
+        else:
+            print(f"❌ Failed to find {package}: not installed")
             return False
     
-    # Test pip version
+    # Test pip version from installed metadata rather than spawning pip
     try:
-        result = subprocess.run([sys.executable, '-m', 'pip', '--version'], 
-                              capture_output=True, text=True)
-        print(f"\nPip Version: {result.stdout.strip()}")
-    except Exception as e:
-        print(f"❌ Error checking pip version: {e}")
+        print(f"\nPip Version: pip {metadata.version('pip')}")
+    except metadata.PackageNotFoundError:
+        print("❌ Pip not installed")
     
     # Test PyTorch CUDA availability
     try:
@@ -5,34 +5,293 @@ File Verification Script for Stable Diffusion Service
 This script checks all project files for common issues and validates the setup.
 """
 
+import ast
 import os
+import hashlib
 import json
+import re
 import sys
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+# Probe tables for fastapi_service.py, built once at import
+_EXPECTED_ENDPOINTS = (
+    '@app.post("/generate"',
+    '@app.post("/upscale"',
+    '@app.post("/upscale-directory"',
+    '@app.post("/upscale-highres"',
+    '@app.post("/test-schedulers"',
+    '@app.get("/schedulers"',
+    '@app.get("/download/',
+    '@app.get("/health"',
+    '@app.get("/"'
+)
+_SWAGGER_PROBES = ('FastAPI(', 'title=', 'BaseModel', 'Field(', 'response_model=', '"""')
+# Longest first so no probe is shadowed by a shorter one sharing its prefix
+_FASTAPI_PROBE_RE = re.compile("|".join(
+    re.escape(probe) for probe in sorted(_EXPECTED_ENDPOINTS + _SWAGGER_PROBES, key=len, reverse=True)
+))
+_FROM_LINE_RE = re.compile(r'^[ \t]*FROM (.*)$', re.MULTILINE)
+_DOCKER_PROBES = (
+    "nvidia/cuda",
+    "python3.12",
+    "python3.12 -m venv",
+    "update-alternatives",
+    "VIRTUAL_ENV",
+    "start_studio.sh",
+    "streamlit",
+    "EXPOSE 8000",
+    "8000",
+    "EXPOSE 8501",
+    "8501"
+)
+
+def _probe_matcher(probes: Sequence[str]) -> Callable[[str], Set[str]]:
+    """
+    Build a single-pass multi-substring matcher.
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, otherwise
+    one lookahead regex. Probes may overlap (e.g. "8000" inside "EXPOSE 8000"),
+    so every probe occurring anywhere in the text is reported.
+    
+    Args:
+        probes: Literal strings to look for
+        
+    Returns:
+        Function mapping text to the set of probes it contains
+    """
+    try:
+        import ahocorasick  # type: ignore[import-not-found]
+    except ImportError:
+        pass
+    else:
+        automaton = ahocorasick.Automaton()
+        for probe in probes:
+            automaton.add_word(probe, probe)
+        automaton.make_automaton()
+        return lambda text: {probe for _, probe in automaton.iter(text)}
+    
+    # The lookahead yields the longest probe starting at each offset; any
+    # shorter probe sharing that offset is a prefix of it, so containment
+    # in a hit recovers the full set
+    pattern = re.compile("(?=(" + "|".join(
+        re.escape(probe) for probe in sorted(probes, key=len, reverse=True)
+    ) + "))")
+    
+    def match(text: str) -> Set[str]:
+        hits = set(pattern.findall(text))
+        return {probe for probe in probes if any(probe in hit for hit in hits)}
+    
+    return match
+
+_match_docker_probes = _probe_matcher(_DOCKER_PROBES)
+
+class _SyntaxCache:
+    """
+    Zero-byte sentinel files marking sources that already parsed cleanly.
+    
+    Keys hash the source bytes together with the interpreter version, so an
+    edit or a Python upgrade invalidates the entry without any bookkeeping.
+    """
+    
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = Path(cache_dir)
+    
+    @staticmethod
+    def _version() -> str:
+        return ".".join(map(str, sys.version_info[:3]))
+    
+    def key(self, source: bytes) -> str:
+        return hashlib.sha256(source + f"\0{self._version()}\0parse".encode()).hexdigest()
+    
+    def get(self, key: str) -> bool:
+        return (self.cache_dir / f"{key}.ok").exists()
+    
+    def put(self, key: str) -> None:
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            (self.cache_dir / f"{key}.ok").touch()
+        except OSError:
+            pass
+    
+    def prune(self, keep: Set[str]) -> None:
+        """Delete sentinels whose key is not in keep, so edited sources don't pile up."""
+        try:
+            stale = [p for p in self.cache_dir.glob("*.ok") if p.stem not in keep]
+        except OSError:
+            return
+        for sentinel in stale:
+            try:
+                sentinel.unlink()
+            except OSError:
+                pass
+    
+    def load_stats(self) -> Dict[str, List[Any]]:
+        """Return the [mtime_ns, size, key] recorded per file by the last run on this interpreter."""
+        try:
+            with open(self.cache_dir / "mtime.json", 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("python") != self._version():
+            return {}
+        files = data.get("files")
+        return files if isinstance(files, dict) else {}
+    
+    def save_stats(self, files: Dict[str, List[Any]]) -> None:
+        """Replace the recorded stats atomically so a concurrent run never sees half a file."""
+        tmp = self.cache_dir / f"mtime.json.{os.getpid()}.tmp"
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            with open(tmp, 'w') as f:
+                json.dump({"python": self._version(), "files": files}, f)
+            os.replace(tmp, self.cache_dir / "mtime.json")
+        except OSError:
+            pass
+
+def _compile_one(job: Tuple[str, str, str]) -> Tuple[str, str, str, str]:
+    """
+    Syntax-check one Python file in a worker process, skipping sources cached as OK.
+    
+    Args:
+        job: (absolute path, display name, cache directory) tuple
+    
+    Returns:
+        (display name, "ok" | "syntax" | "missing" | "error", error message or "",
+        cache key or "") tuple
+    """
+    path, name, cache_dir = job
+    key = ""
+    try:
+        with open(path, 'rb') as f:
+            source = f.read()
+        cache = _SyntaxCache(cache_dir)
+        key = cache.key(source)
+        if cache.get(key):
+            return name, "ok", "", key
+        # Parsing alone catches syntax errors without emitting bytecode
+        ast.parse(source, filename=name)
+        cache.put(key)
+        return name, "ok", "", key
+    except FileNotFoundError:
+        return name, "missing", "", key
+    except SyntaxError as e:
+        return name, "syntax", str(e), key
+    except Exception as e:
+        return name, "error", str(e), key
 
 class ProjectVerifier:
-    def __init__(self, project_dir: str = "."):
+    def __init__(self, project_dir: str = ".") -> None:
         self.project_dir = Path(project_dir)
-        self.issues = []
-        self.warnings = []
+        # Plain-string root for os.path.join; avoids building a Path per lookup
+        self._root_str = str(self.project_dir)
+        self.issues: List[str] = []
+        self.warnings: List[str] = []
+        # Several checks inspect the same files; read each one at most once
+        self._file_cache: Dict[str, Optional[str]] = {}
+        self._listings: Dict[str, Dict[str, os.DirEntry[str]]] = {}
+        self._fastapi_scanned = False
+        self._fastapi_hits: Optional[Counter[str]] = None
+        self._scan_lock = threading.Lock()
+        # Report records are buffered per thread and written once per check
+        # instead of one print() each; see _flush()
+        self._local = threading.local()
+        
+    def _read(self, name: str) -> Optional[str]:
+        """
+        Return the text of a project file, or None if it is missing, reading it only once.
+        
+        Callers only search the text for ASCII probes, so it is decoded as
+        latin-1: every byte maps to one character with no validation pass,
+        and ASCII literals still match exactly where they would under UTF-8.
+        """
+        if name not in self._file_cache:
+            try:
+                with open(os.path.join(self._root_str, name), 'r', encoding='latin-1') as f:
+                    self._file_cache[name] = f.read()
+            except FileNotFoundError:
+                self._file_cache[name] = None
+        return self._file_cache[name]
+    
+    def _record(self, line: str, kind: Optional[str] = None, text: str = "") -> None:
+        """Queue a report line (and an optional issue/warning) on the calling thread."""
+        if not hasattr(self._local, "out"):
+            self._local.out = []
+        self._local.out.append((line, kind, text))
+    
+    def _take(self) -> List[Tuple[str, Optional[str], str]]:
+        """Detach and return the calling thread's queued records."""
+        records = getattr(self._local, "out", [])
+        self._local.out = []
+        return records
+    
+    def _emit(self, line: str) -> None:
+        """Queue a report line for the next _flush()."""
+        self._record(line)
+    
+    def _flush(self, records: Optional[List[Tuple[str, Optional[str], str]]] = None) -> None:
+        """
+        Apply queued records to the issue/warning lists and write their lines in a single call.
         
-    def log_issue(self, issue: str):
+        Args:
+            records: Records taken from a worker thread; defaults to the calling thread's queue
+        """
+        if records is None:
+            records = self._take()
+        for _, kind, text in records:
+            if kind == "issue":
+                self.issues.append(text)
+            elif kind == "warning":
+                self.warnings.append(text)
+        if records:
+            sys.stdout.write("\n".join(line for line, _, _ in records) + "\n")
+            sys.stdout.flush()
+    
+    def log_issue(self, issue: str) -> None:
         """Log a critical issue."""
-        self.issues.append(issue)
-        print(f"❌ ISSUE: {issue}")
+        self._record(f"❌ ISSUE: {issue}", "issue", issue)
         
-    def log_warning(self, warning: str):
+    def log_warning(self, warning: str) -> None:
         """Log a warning."""
-        self.warnings.append(warning)
-        print(f"⚠️  WARNING: {warning}")
+        self._record(f"⚠️  WARNING: {warning}", "warning", warning)
         
-    def log_success(self, message: str):
+    def log_success(self, message: str) -> None:
         """Log a success message."""
-        print(f"✅ {message}")
+        self._emit(f"✅ {message}")
+    
+    def _entry(self, name: str) -> Optional[os.DirEntry[str]]:
+        """
+        Look up a project-relative path in cached directory listings.
+        
+        Each parent directory is read once with os.scandir, so repeated checks
+        become dict lookups instead of one stat() per file. The returned
+        DirEntry caches its stat() result, so later mode checks stat at most once.
+        
+        Args:
+            name: Path relative to the project directory
+            
+        Returns:
+            os.DirEntry for the path, or None if it is missing
+        """
+        parent, _, base = name.rpartition("/")
+        if parent not in self._listings:
+            try:
+                with os.scandir(os.path.join(self._root_str, parent)) as it:
+                    self._listings[parent] = {entry.name: entry for entry in it}
+            except (FileNotFoundError, NotADirectoryError):
+                self._listings[parent] = {}
+        return self._listings[parent].get(base)
+    
+    def _present(self, name: str) -> bool:
+        """Return True if a project-relative path exists (see _entry)."""
+        return self._entry(name) is not None
     
-    def check_required_files(self):
+    def check_required_files(self) -> None:
         """Check if all required files exist."""
-        print("\n📁 Checking Required Files...")
+        self._emit("\n📁 Checking Required Files...")
         
         required_files = [
             "fastapi_service.py",
@@ -53,15 +312,14 @@ class ProjectVerifier:
         ]
         
         for file in required_files:
-            file_path = self.project_dir / file
-            if file_path.exists():
+            if self._present(file):
                 self.log_success(f"Found {file}")
             else:
                 self.log_issue(f"Missing required file: {file}")
     
-    def check_python_syntax(self):
+    def check_python_syntax(self) -> None:
         """Check Python files for syntax errors."""
-        print("\n🐍 Checking Python Syntax...")
+        self._emit("\n🐍 Checking Python Syntax...")
         
         python_files = [
             "fastapi_service.py",
@@ -75,110 +333,147 @@ class ProjectVerifier:
             "examples/upscaling_example.py"
         ]
         
+        # Files whose mtime and size match the last clean run are not even
+        # read; everything else goes to the sha256 check in the workers
+        cache_dir = os.path.join(self._root_str, ".verify_cache")
+        cache = _SyntaxCache(cache_dir)
+        recorded = cache.load_stats()
+        current = {}
+        results = {}
+        jobs = []
         for file in python_files:
-            file_path = self.project_dir / file
-            if file_path.exists():
-                try:
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                    compile(content, file, 'exec')
-                    self.log_success(f"Python syntax OK: {file}")
-                except SyntaxError as e:
-                    self.log_issue(f"Syntax error in {file}: {e}")
-                except Exception as e:
-                    self.log_warning(f"Could not check {file}: {e}")
+            path = os.path.join(self._root_str, file)
+            try:
+                st = os.stat(path)
+            except OSError:
+                pass  # the worker's open() reports it
             else:
+                current[file] = [st.st_mtime_ns, st.st_size]
+                entry = recorded.get(file)
+                if isinstance(entry, list) and len(entry) == 3 and entry[:2] == current[file]:
+                    results[file] = (file, "ok", "", entry[2])
+                    continue
+            jobs.append((path, file, cache_dir))
+        
+        # Files compile independently, so spread them across processes
+        if len(jobs) < 2:
+            compiled = [_compile_one(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                compiled = list(executor.map(_compile_one, jobs, chunksize=2))
+        for result in compiled:
+            results[result[0]] = result
+        
+        if jobs:
+            cache.save_stats({
+                file: current[file] + [key] for file, (_, status, _, key) in results.items()
+                if status == "ok" and file in current
+            })
+            # Only the sentinels of the sources as they are now stay, so the
+            # directory is bounded by the number of checked files
+            cache.prune({key for _, _, _, key in results.values() if key})
+        
+        for file in python_files:
+            _, status, error, _ = results[file]
+            if status == "ok":
+                self.log_success(f"Python syntax OK: {file}")
+            elif status == "syntax":
+                self.log_issue(f"Syntax error in {file}: {error}")
+            elif status == "missing":
                 self.log_warning(f"Python file not found: {file}")
+            else:
+                self.log_warning(f"Could not check {file}: {error}")
     
-    def check_docker_files(self):
+    def check_docker_files(self) -> None:
         """Check Docker configuration files."""
-        print("\n🐳 Checking Docker Configuration...")
+        self._emit("\n🐳 Checking Docker Configuration...")
         
         # Check Dockerfile
-        dockerfile_path = self.project_dir / "docker" / "Dockerfile"
-        if dockerfile_path.exists():
-            with open(dockerfile_path, 'r') as f:
-                content = f.read()
+        content = self._read("docker/Dockerfile")
+        if content is not None:
+            # One pass over the Dockerfile answers every probe below
+            found = _match_docker_probes(content)
             
-            if "nvidia/cuda" in content:
+            if "nvidia/cuda" in found:
                 self.log_success("Dockerfile uses NVIDIA CUDA base image")
             else:
                 self.log_warning("Dockerfile doesn't use NVIDIA CUDA base image")
                 
-            if "python3.12" in content:
+            if "python3.12" in found:
                 self.log_success("Dockerfile installs Python 3.12")
             else:
                 self.log_warning("Dockerfile doesn't explicitly install Python 3.12")
                 
-            if "update-alternatives" in content and "python3.12" in content:
+            if "update-alternatives" in found and "python3.12" in found:
                 self.log_success("Dockerfile sets Python 3.12 as default")
             else:
                 self.log_warning("Dockerfile doesn't set Python 3.12 as default")
                 
-            if "python3.12 -m venv" in content:
+            if "python3.12 -m venv" in found:
                 self.log_success("Dockerfile creates Python 3.12 virtual environment")
             else:
                 self.log_warning("Dockerfile doesn't create Python virtual environment")
                 
-            if "VIRTUAL_ENV" in content:
+            if "VIRTUAL_ENV" in found:
                 self.log_success("Dockerfile configures virtual environment")
             else:
                 self.log_warning("Dockerfile doesn't configure virtual environment")
                 
-            if "start_studio.sh" in content or "streamlit" in content:
+            if "start_studio.sh" in found or "streamlit" in found:
                 self.log_success("Dockerfile configured for Streamlit UI")
             else:
                 self.log_warning("Dockerfile doesn't include Streamlit configuration")
                 
-            if "EXPOSE 8000" in content or "8000" in content:
+            if "EXPOSE 8000" in found or "8000" in found:
                 self.log_success("Dockerfile exposes port 8000 (FastAPI)")
             else:
                 self.log_warning("Dockerfile doesn't expose port 8000")
                 
-            if "EXPOSE 8501" in content or "8501" in content:
+            if "EXPOSE 8501" in found or "8501" in found:
                 self.log_success("Dockerfile exposes port 8501 (Streamlit)")
             else:
                 self.log_warning("Dockerfile doesn't expose port 8501")
         
         # Check docker-compose.yml
-        compose_path = self.project_dir / "docker" / "docker-compose.yml"
-        if compose_path.exists():
-            try:
-                import yaml
-                with open(compose_path, 'r') as f:
-                    compose_config = yaml.safe_load(f)
+        compose_path = os.path.join(self._root_str, "docker", "docker-compose.yml")
+        try:
+            with open(compose_path, 'r') as f:
+                import yaml  # type: ignore[import-untyped]
+                # The libyaml-backed loader is much faster when PyYAML was built with it
+                loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                compose_config = yaml.load(f, Loader=loader)
+            
+            services = compose_config.get('services') or {}
+            service_name = next(iter(services), None)
+            if service_name is not None:
+                service = services[service_name]
                 
-                services = compose_config.get('services', {})
-                if services:
-                    service_name = list(services.keys())[0]
-                    service = services[service_name]
+                if 'deploy' in service and 'resources' in service['deploy']:
+                    self.log_success("Docker Compose has GPU resource configuration")
+                else:
+                    self.log_warning("Docker Compose missing GPU configuration")
                     
-                    if 'deploy' in service and 'resources' in service['deploy']:
-                        self.log_success("Docker Compose has GPU resource configuration")
-                    else:
-                        self.log_warning("Docker Compose missing GPU configuration")
-                        
-                    ports = service.get('ports', [])
-                    if any('8000:8000' in str(port) for port in ports):
-                        self.log_success("Docker Compose exposes port 8000")
-                    else:
-                        self.log_issue("Docker Compose doesn't expose port 8000")
-                        
-                self.log_success("Docker Compose file is valid YAML")
-            except ImportError:
-                self.log_warning("PyYAML not available - skipping docker-compose validation")
-            except Exception as e:
-                self.log_issue(f"Docker Compose file error: {e}")
+                ports = service.get('ports', [])
+                # One substring scan over the joined specs; a newline cannot be part of a match
+                if '8000:8000' in '\n'.join(map(str, ports)):
+                    self.log_success("Docker Compose exposes port 8000")
+                else:
+                    self.log_issue("Docker Compose doesn't expose port 8000")
+                    
+            self.log_success("Docker Compose file is valid YAML")
+        except FileNotFoundError:
+            pass
+        except ImportError:
+            self.log_warning("PyYAML not available - skipping docker-compose validation")
+        except Exception as e:
+            self.log_issue(f"Docker Compose file error: {e}")
     
-    def check_requirements(self):
+    def check_requirements(self) -> None:
         """Check requirements.txt."""
-        print("\n📦 Checking Requirements...")
+        self._emit("\n📦 Checking Requirements...")
         
-        req_path = self.project_dir / "config" / "requirements.txt"
-        if req_path.exists():
-            with open(req_path, 'r') as f:
-                requirements = f.read()
-            
+        requirements = self._read("config/requirements.txt")
+        if requirements is not None:
             required_packages = [
                 'torch',
                 'diffusers', 
@@ -196,52 +491,53 @@ class ProjectVerifier:
                 else:
                     self.log_issue(f"Missing required package: {package}")
     
-    def check_scripts_executable(self):
+    def check_scripts_executable(self) -> None:
         """Check if scripts are executable."""
-        print("\n🔧 Checking Script Permissions...")
+        self._emit("\n🔧 Checking Script Permissions...")
         
         scripts = ["scripts/deploy.sh", "scripts/start.sh", "tests/test_api.py"]
         
         for script in scripts:
-            script_path = self.project_dir / script
-            if script_path.exists():
-                if os.access(script_path, os.X_OK):
+            entry = self._entry(script)
+            if entry is not None:
+                # Any execute bit counts; this reuses the entry's cached stat instead of os.access
+                if entry.stat().st_mode & 0o111:
                     self.log_success(f"Script is executable: {script}")
                 else:
                     self.log_warning(f"Script not executable: {script} (run: chmod +x {script})")
             else:
                 self.log_warning(f"Script not found: {script}")
     
-    def check_api_endpoints(self):
+    def _scan_fastapi_service(self) -> Optional[Counter[str]]:
+        """
+        Count every probe token in fastapi_service.py with one regex pass.
+        
+        Returns:
+            Counter of token -> occurrences (shared by later checks), or None if the file is missing
+        """
+        # The endpoint and swagger checks may ask at the same time
+        with self._scan_lock:
+            if not self._fastapi_scanned:
+                content = self._read("fastapi_service.py")
+                self._fastapi_hits = None if content is None else Counter(_FASTAPI_PROBE_RE.findall(content))
+                self._fastapi_scanned = True
+        return self._fastapi_hits
+    
+    def check_api_endpoints(self) -> None:
         """Check FastAPI service for endpoint definitions."""
-        print("\n🌐 Checking API Endpoints...")
+        self._emit("\n🌐 Checking API Endpoints...")
         
-        fastapi_path = self.project_dir / "fastapi_service.py"
-        if fastapi_path.exists():
-            with open(fastapi_path, 'r') as f:
-                content = f.read()
-            
-            expected_endpoints = [
-                '@app.post("/generate"',
-                '@app.post("/upscale"',
-                '@app.post("/upscale-directory"',
-                '@app.post("/upscale-highres"',
-                '@app.post("/test-schedulers"',
-                '@app.get("/schedulers"',
-                '@app.get("/download/',
-                '@app.get("/health"',
-                '@app.get("/"'
-            ]
-            
-            for endpoint in expected_endpoints:
-                if endpoint in content:
+        hits = self._scan_fastapi_service()
+        if hits is not None:
+            for endpoint in _EXPECTED_ENDPOINTS:
+                if hits[endpoint]:
                     self.log_success(f"Endpoint found: {endpoint}")
                 else:
                     self.log_issue(f"Missing endpoint: {endpoint}")
     
-    def check_output_directories(self):
+    def check_output_directories(self) -> None:
         """Check if output directories exist or can be created."""
-        print("\n📂 Checking Output Directories...")
+        self._emit("\n📂 Checking Output Directories...")
         
         directories = [
             "final_outputs",
@@ -257,35 +553,32 @@ class ProjectVerifier:
             except Exception as e:
                 self.log_issue(f"Cannot create directory {directory}: {e}")
     
-    def check_swagger_ui(self):
+    def check_swagger_ui(self) -> None:
         """Check if Swagger UI endpoints are properly configured."""
-        print("\n📚 Checking Swagger UI Configuration...")
+        self._emit("\n📚 Checking Swagger UI Configuration...")
         
-        fastapi_path = self.project_dir / "fastapi_service.py"
-        if fastapi_path.exists():
-            with open(fastapi_path, 'r') as f:
-                content = f.read()
-            
+        hits = self._scan_fastapi_service()
+        if hits is not None:
             # Check for FastAPI instance with proper configuration
-            if 'FastAPI(' in content and 'title=' in content:
+            if hits['FastAPI('] and hits['title=']:
                 self.log_success("FastAPI app configured with title")
             else:
                 self.log_warning("FastAPI app missing title configuration")
             
             # Check for proper Pydantic models (required for Swagger documentation)
-            if 'BaseModel' in content and 'Field(' in content:
+            if hits['BaseModel'] and hits['Field(']:
                 self.log_success("Pydantic models properly configured for Swagger")
             else:
                 self.log_issue("Missing Pydantic models or Field descriptions")
             
             # Check for response models in endpoints
-            if 'response_model=' in content:
+            if hits['response_model=']:
                 self.log_success("Endpoints have response models for Swagger documentation")
             else:
                 self.log_warning("Some endpoints may be missing response models")
             
             # Check for proper docstrings
-            docstring_count = content.count('"""')
+            docstring_count = hits['"""']
             if docstring_count >= 10:  # Expect at least 5 endpoints with docstrings
                 self.log_success("Endpoints have documentation strings")
             else:
@@ -294,32 +587,28 @@ class ProjectVerifier:
         self.log_success("Swagger UI will be available at /docs")
         self.log_success("ReDoc will be available at /redoc")
     
-    def check_docker_image_availability(self):
+    def check_docker_image_availability(self) -> None:
         """Check if the Docker base image is available."""
-        print("\n🐳 Checking Docker Image Availability...")
+        self._emit("\n🐳 Checking Docker Image Availability...")
         
-        dockerfile_path = self.project_dir / "Dockerfile"
-        if dockerfile_path.exists():
-            with open(dockerfile_path, 'r') as f:
-                content = f.read()
-            
-            # Extract the base image from Dockerfile
-            for line in content.split('\n'):
-                if line.strip().startswith('FROM '):
-                    base_image = line.strip().replace('FROM ', '')
-                    self.log_success(f"Base image configured: {base_image}")
-                    
-                    # Check if it's a NVIDIA CUDA image
-                    if 'nvidia/cuda' in base_image:
-                        self.log_success("Using NVIDIA CUDA base image")
-                        if 'devel' in base_image:
-                            self.log_success("Using development image (includes build tools)")
-                        elif 'runtime' in base_image:
-                            self.log_success("Using runtime image (smaller size)")
-                    else:
-                        self.log_warning("Not using NVIDIA CUDA base image")
-                    
-                    break
+        content = self._read("docker/Dockerfile")
+        if content is not None:
+            # Extract the base image from Dockerfile; the search stops at the
+            # first FROM (normally the top line) without splitting the whole file
+            match = _FROM_LINE_RE.search(content)
+            if match:
+                base_image = match.group(1).strip()
+                self.log_success(f"Base image configured: {base_image}")
+                
+                # Check if it's a NVIDIA CUDA image
+                if 'nvidia/cuda' in base_image:
+                    self.log_success("Using NVIDIA CUDA base image")
+                    if 'devel' in base_image:
+                        self.log_success("Using development image (includes build tools)")
+                    elif 'runtime' in base_image:
+                        self.log_success("Using runtime image (smaller size)")
+                else:
+                    self.log_warning("Not using NVIDIA CUDA base image")
             else:
                 self.log_issue("No FROM statement found in Dockerfile")
             
@@ -330,24 +619,20 @@ class ProjectVerifier:
                 self.log_warning("Missing NVIDIA GPU environment variables")
         
         # Check if troubleshooting script exists
-        troubleshoot_script = self.project_dir / "scripts" / "docker_troubleshoot.sh"
-        if troubleshoot_script.exists():
+        if self._present("scripts/docker_troubleshoot.sh"):
             self.log_success("Docker troubleshooting script available")
         else:
             self.log_warning("Docker troubleshooting script not found")
     
-    def check_virtual_environment_support(self):
+    def check_virtual_environment_support(self) -> None:
         """Check if startup scripts properly support virtual environment."""
-        print("\n🐍 Checking Virtual Environment Support...")
+        self._emit("\n🐍 Checking Virtual Environment Support...")
         
         startup_scripts = ["scripts/start_studio.sh", "scripts/run_local.sh", "scripts/install_dependencies.sh"]
         
         for script_name in startup_scripts:
-            script_path = self.project_dir / script_name
-            if script_path.exists():
-                with open(script_path, 'r') as f:
-                    content = f.read()
-                
+            content = self._read(script_name)
+            if content is not None:
                 if "VIRTUAL_ENV" in content or "/opt/venv" in content:
                     self.log_success(f"{script_name} has virtual environment support")
                 else:
@@ -359,49 +644,69 @@ class ProjectVerifier:
                     else:
                         self.log_warning(f"{script_name} doesn't use virtual environment pip")
 
-    def run_verification(self):
+    def run_verification(self) -> bool:
         """Run all verification checks."""
-        print("🔍 Project Verification Starting...")
-        print("=" * 50)
-        
-        self.check_required_files()
-        self.check_python_syntax()
-        self.check_docker_files()
-        self.check_docker_image_availability()
-        self.check_requirements()
-        self.check_scripts_executable()
-        self.check_virtual_environment_support()
-        self.check_api_endpoints()
-        self.check_swagger_ui()
-        self.check_output_directories()
-        self.check_virtual_environment_support()
-        
-        print("\n" + "=" * 50)
-        print("📋 VERIFICATION SUMMARY")
-        print("=" * 50)
+        self._emit("🔍 Project Verification Starting...")
+        self._emit("=" * 50)
+        
+        self._flush()
+        
+        checks = (
+            self.check_required_files,
+            self.check_python_syntax,
+            self.check_docker_files,
+            self.check_docker_image_availability,
+            self.check_requirements,
+            self.check_scripts_executable,
+            self.check_virtual_environment_support,
+            self.check_api_endpoints,
+            self.check_swagger_ui,
+            self.check_output_directories,
+            self.check_virtual_environment_support,
+        )
+        
+        def run(check: Callable[[], None]) -> List[Tuple[str, Optional[str], str]]:
+            check()
+            return self._take()
+        
+        # check_python_syntax forks its own process pool, so it runs before
+        # any worker thread exists; the remaining checks are I/O-bound and
+        # independent, and their records are flushed in the listed order
+        done = {self.check_python_syntax: run(self.check_python_syntax)}
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [None if check in done else executor.submit(run, check) for check in checks]
+            for check, future in zip(checks, futures):
+                self._flush(done[check] if future is None else future.result())
+        
+        self._emit("\n" + "=" * 50)
+        self._emit("📋 VERIFICATION SUMMARY")
+        self._emit("=" * 50)
         
         if not self.issues and not self.warnings:
-            print("🎉 All checks passed! Project is ready for deployment.")
+            self._emit("🎉 All checks passed! Project is ready for deployment.")
+            self._flush()
             return True
         
         if self.issues:
-            print(f"❌ Found {len(self.issues)} critical issues:")
+            self._emit(f"❌ Found {len(self.issues)} critical issues:")
             for issue in self.issues:
-                print(f"   • {issue}")
+                self._emit(f"   • {issue}")
         
         if self.warnings:
-            print(f"⚠️  Found {len(self.warnings)} warnings:")
+            self._emit(f"⚠️  Found {len(self.warnings)} warnings:")
             for warning in self.warnings:
-                print(f"   • {warning}")
+                self._emit(f"   • {warning}")
         
         if self.issues:
-            print("\n🔧 Fix critical issues before deployment.")
+            self._emit("\n🔧 Fix critical issues before deployment.")
+            self._flush()
             return False
         else:
-            print("\n✅ No critical issues found. Warnings can be addressed optionally.")
+            self._emit("\n✅ No critical issues found. Warnings can be addressed optionally.")
+            self._flush()
             return True
 
-def main():
+def main() -> None:
     """Main function."""
     project_dir = sys.argv[1] if len(sys.argv) > 1 else "."
     